@@ -1,36 +1,95 @@
 """
 Cross-platform deployment script for AWS Lambda.
-Creates a deployment package with all dependencies.
+Creates a dependency layer (layer.zip) and a source-only function package (function.zip).
 """
 
+import hashlib
 import os
 import shutil
 import subprocess
+import sys
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Dependencies are installed under python/ as Lambda layers require
+LAYER_DIR = "layer"
+LAYER_ZIP = "layer.zip"
+LAYER_HASH_FILE = "layer.zip.sha256"
+
+# Function package holds only the handler and src/, zipped straight from
+# the project tree as (source path, path inside the zip). config/ is left
+# out: inside Lambda, configuration comes from environment variables only.
+FUNCTION_ZIP = "function.zip"
+FUNCTION_SOURCES = [
+    ("lambda_function.py", "lambda_function.py"),
+    ("src", "src"),
+]
+
+# Directories, directory suffixes and file suffixes never needed at runtime
+EXCLUDED_DIRS = ('__pycache__', 'tests', 'test')
+EXCLUDED_DIR_SUFFIXES = ('.dist-info',)
+EXCLUDED_FILE_SUFFIXES = ('.pyc', '.pyi', '.so.debug')
+
+# Fastest deflate level; higher levels cost far more time than they save in size
+ZIP_COMPRESS_LEVEL = 1
+
+# Already-compressed or binary files that are stored without compression
+STORED_EXTENSIONS = ('.so', '.pyd', '.whl', '.dylib')
+
+# Vendored libraries of auditwheel-repaired wheels (e.g. psycopg2_binary.libs)
+# were rewritten by patchelf, and stripping such files can corrupt them
+STRIP_EXCLUDED_DIR_SUFFIXES = ('.libs',)
+
+# Modules imported from the built layer to catch a broken dependency early
+LAYER_IMPORT_CHECKS = ('psycopg2', 'dotenv')
+
+# Everything besides requirements.txt that changes the layer's contents;
+# part of the layer hash so a change to these rules rebuilds it
+LAYER_BUILD_SETTINGS = (
+    EXCLUDED_DIRS,
+    EXCLUDED_DIR_SUFFIXES,
+    EXCLUDED_FILE_SUFFIXES,
+    STORED_EXTENSIONS,
+    ZIP_COMPRESS_LEVEL,
+    STRIP_EXCLUDED_DIR_SUFFIXES,
+)
+
 
 def clean_previous_builds():
-    """Remove previous build artifacts."""
+    """Remove previous function build artifacts (the layer is cached)."""
     print("Cleaning up previous builds...")
-    if os.path.exists("package"):
-        shutil.rmtree("package")
-    if os.path.exists("lambda-deployment.zip"):
-        os.remove("lambda-deployment.zip")
+    if os.path.exists(FUNCTION_ZIP):
+        os.remove(FUNCTION_ZIP)
+
+
+def get_layer_hash():
+    """Get SHA-256 hash of requirements.txt and the layer build settings."""
+    digest = hashlib.sha256()
+    with open("requirements.txt", "rb") as f:
+        digest.update(f.read())
+    digest.update(repr(LAYER_BUILD_SETTINGS).encode())
+    return digest.hexdigest()
+
 
+def layer_is_current(layer_hash):
+    """Check whether layer.zip was built from the current requirements and settings."""
+    if not os.path.exists(LAYER_ZIP) or not os.path.exists(LAYER_HASH_FILE):
+        return False
 
-def create_package_directory():
-    """Create package directory for deployment."""
-    print("Creating package directory...")
-    os.makedirs("package", exist_ok=True)
+    with open(LAYER_HASH_FILE, "r") as f:
+        return f.read().strip() == layer_hash
 
 
 def install_dependencies():
-    """Install Python dependencies to package directory."""
+    """Install Python dependencies into the layer's python/ directory."""
     print("Installing dependencies...")
     try:
         subprocess.run(
-            ["pip", "install", "-r", "requirements.txt", "-t", "package/"],
+            # Same interpreter as check_layer_imports, so compiled extensions match its ABI
+            [sys.executable, "-m", "pip", "install", "-r", "requirements.txt",
+             "-t", os.path.join(LAYER_DIR, "python")],
             check=True,
             capture_output=True,
             text=True
@@ -42,42 +101,187 @@ def install_dependencies():
         raise
 
 
-def copy_source_code():
-    """Copy source code to package directory."""
-    print("Copying source code...")
+def strip_shared_libraries(directory):
+    """Strip debug symbols from shared libraries (Linux builds only)."""
+    if not sys.platform.startswith("linux") or not shutil.which("strip"):
+        return
+
+    print("Stripping shared libraries...")
+    for root, dirs, files in os.walk(directory):
+        # Leave patchelf-repaired vendored libraries untouched
+        dirs[:] = [d for d in dirs if not d.endswith(STRIP_EXCLUDED_DIR_SUFFIXES)]
+        for file in files:
+            if (file.endswith(".so") or ".so." in file) and not file.endswith(".so.debug"):
+                file_path = os.path.join(root, file)
+                # Best effort: a library that cannot be stripped is kept as-is
+                result = subprocess.run(
+                    ["strip", "--strip-unneeded", file_path],
+                    capture_output=True,
+                    text=True
+                )
+                if result.returncode != 0:
+                    print(f"⚠ Could not strip {file_path}: {result.stderr.strip()}")
 
-    # Copy src directory
-    if os.path.exists("src"):
-        shutil.copytree("src", "package/src", dirs_exist_ok=True)
 
-    # Copy lambda_function.py
-    shutil.copy2("lambda_function.py", "package/")
+def check_layer_imports(directory):
+    """
+    Import the layer's key dependencies in a fresh interpreter.
 
-    # Copy config directory if it exists
-    if os.path.exists("config"):
-        shutil.copytree("config", "package/config", dirs_exist_ok=True)
+    Catches libraries broken by stripping before the layer is published.
 
-    print("✓ Source code copied")
+    Raises:
+        RuntimeError: If a module fails to import from the layer
+    """
+    print("Checking layer imports...")
+    env = dict(os.environ, PYTHONPATH=os.path.join(directory, "python"))
+    for module in LAYER_IMPORT_CHECKS:
+        result = subprocess.run(
+            [sys.executable, "-c", f"import {module}"],
+            env=env,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Layer module '{module}' failed to import: {result.stderr.strip()}")
+    print("✓ Layer imports OK")
 
 
-def create_deployment_zip():
-    """Create deployment zip file."""
-    print("Creating deployment zip file...")
+def build_layer():
+    """
+    Build layer.zip with all dependencies, unless requirements.txt and the
+    layer build settings are unchanged.
 
-    with zipfile.ZipFile("lambda-deployment.zip", "w", zipfile.ZIP_DEFLATED) as zipf:
-        # Walk through package directory and add all files
-        for root, dirs, files in os.walk("package"):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, "package")
-                zipf.write(file_path, arcname)
+    Returns:
+        bool: True if the layer was rebuilt, False if the cached one was kept
+    """
+    layer_hash = get_layer_hash()
+    if layer_is_current(layer_hash):
+        print("✓ requirements.txt and build settings unchanged, reusing existing layer.zip")
+        return False
+
+    print("Building dependency layer...")
+    if os.path.exists(LAYER_DIR):
+        shutil.rmtree(LAYER_DIR)
+    if os.path.exists(LAYER_ZIP):
+        os.remove(LAYER_ZIP)
+
+    install_dependencies()
+    strip_shared_libraries(LAYER_DIR)
+    check_layer_imports(LAYER_DIR)
+    create_zip([(LAYER_DIR, "")], LAYER_ZIP)
+
+    with open(LAYER_HASH_FILE, "w") as f:
+        f.write(layer_hash)
+
+    return True
+
+
+def collect_files(source_path, arc_path):
+    """
+    Collect files to zip from a file or directory, skipping excluded entries.
+
+    Args:
+        source_path (str): File or directory on disk
+        arc_path (str): Matching path inside the zip ("" for the zip root)
+
+    Returns:
+        list: (file_path, arcname) tuples
+    """
+    if os.path.isfile(source_path):
+        return [(source_path, arc_path)]
+
+    collected = []
+    for root, dirs, files in os.walk(source_path):
+        # Prune excluded directories so they are not walked at all
+        dirs[:] = [
+            d for d in dirs
+            if d not in EXCLUDED_DIRS and not d.endswith(EXCLUDED_DIR_SUFFIXES)
+        ]
+        for file in files:
+            if file.endswith(EXCLUDED_FILE_SUFFIXES):
+                continue
+            file_path = os.path.join(root, file)
+            arcname = os.path.join(arc_path, os.path.relpath(file_path, source_path))
+            collected.append((file_path, arcname))
+
+    return collected
+
+
+def compress_file(file_path, arcname):
+    """
+    Read and compress a single file for the deployment zip.
+
+    Runs in a worker thread; zlib releases the GIL while compressing.
+
+    Returns:
+        tuple: (ZipInfo with CRC and sizes set, raw member bytes)
+    """
+    zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    zinfo.file_size = len(data)
+    zinfo.CRC = zlib.crc32(data)
+
+    # Binary artifacts barely compress, so store them as-is
+    if file_path.endswith(STORED_EXTENSIONS):
+        zinfo.compress_type = zipfile.ZIP_STORED
+    else:
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+        # Negative wbits produces the raw deflate stream zip members use
+        compressor = zlib.compressobj(ZIP_COMPRESS_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+        data = compressor.compress(data) + compressor.flush()
+
+    zinfo.compress_size = len(data)
+    return zinfo, data
+
+
+def write_compressed_member(zipf, zinfo, data):
+    """
+    Append an already-compressed member to an open zip file.
+
+    zipfile has no public API for pre-compressed data, so this does what
+    ZipFile.writestr does after its own compression step.
+    """
+    zinfo.header_offset = zipf.fp.tell()
+    zipf.fp.write(zinfo.FileHeader())
+    zipf.fp.write(data)
+    zipf.start_dir = zipf.fp.tell()
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf._didModify = True
+
+
+def create_zip(sources, zip_path):
+    """
+    Create a zip from (source path, path inside the zip) pairs, compressing files in parallel.
+
+    Missing source paths are skipped.
+    """
+    print(f"Creating {zip_path}...")
+
+    file_paths = []
+    arcnames = []
+    for source_path, arc_path in sources:
+        if not os.path.exists(source_path):
+            continue
+        for file_path, arcname in collect_files(source_path, arc_path):
+            file_paths.append(file_path)
+            arcnames.append(arcname)
+
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        with ThreadPoolExecutor() as executor:
+            # Workers compress, this thread appends members in order
+            for zinfo, data in executor.map(compress_file, file_paths, arcnames):
+                write_compressed_member(zipf, zinfo, data)
 
-    print("✓ Deployment zip created")
+    print(f"✓ {zip_path} created")
 
 
-def get_zip_size():
-    """Get size of deployment zip."""
-    size_bytes = os.path.getsize("lambda-deployment.zip")
+def get_zip_size(zip_path):
+    """Get size of a zip file in MB."""
+    size_bytes = os.path.getsize(zip_path)
     size_mb = size_bytes / (1024 * 1024)
     return size_mb
 
@@ -92,38 +296,43 @@ def main():
 
     try:
         clean_previous_builds()
-        create_package_directory()
-        install_dependencies()
-        copy_source_code()
-        create_deployment_zip()
+        layer_rebuilt = build_layer()
+        create_zip(FUNCTION_SOURCES, FUNCTION_ZIP)
 
-        size_mb = get_zip_size()
+        layer_size_mb = get_zip_size(LAYER_ZIP)
+        function_size_mb = get_zip_size(FUNCTION_ZIP)
 
         print()
         print("=" * 60)
-        print(f"✓ Deployment package created: lambda-deployment.zip")
-        print(f"  Package size: {size_mb:.2f} MB")
+        print(f"✓ Function package created: {FUNCTION_ZIP}")
+        print(f"  Package size: {function_size_mb:.2f} MB")
+        print(f"✓ Dependency layer {'rebuilt' if layer_rebuilt else 'unchanged'}: {LAYER_ZIP}")
+        print(f"  Layer size: {layer_size_mb:.2f} MB")
         print("=" * 60)
         print()
         print("Next steps:")
-        print("1. Upload lambda-deployment.zip to AWS Lambda")
-        print("2. Set handler to: lambda_function.lambda_handler")
-        print("3. Set Python runtime to: Python 3.12")
-        print("4. Configure environment variables:")
+        if layer_rebuilt:
+            print(f"1. Publish {LAYER_ZIP} as a Lambda layer version (runtime: Python 3.12)")
+            print("   and attach the new version to the function")
+        else:
+            print("1. Keep the currently attached Lambda layer version")
+        print(f"2. Upload {FUNCTION_ZIP} to AWS Lambda")
+        print("3. Set handler to: lambda_function.lambda_handler")
+        print("4. Set Python runtime to: Python 3.12")
+        print("5. Configure environment variables:")
         print("   - DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT")
         print("   - CHUNK_SIZE (e.g., 700)")
         print("   - BATCH_COMMIT_SIZE (e.g., 1000)")
         print("   - AWS_REGION")
-        print("5. Set memory to 1024 MB and timeout to 10 minutes (600 seconds)")
-        print("6. Ensure Lambda has:")
+        print("6. Set memory to 1024 MB and timeout to 10 minutes (600 seconds)")
+        print("7. Ensure Lambda has:")
         print("   - VPC access if database is in VPC")
         print("   - Appropriate IAM role permissions")
         print("=" * 60)
 
-        if size_mb > 50:
+        if layer_size_mb + function_size_mb > 50:
             print()
-            print("⚠ WARNING: Package size exceeds 50MB!")
-            print("  Consider using AWS Lambda Layers for dependencies")
+            print("⚠ WARNING: Combined package size exceeds 50MB!")
 
     except Exception as e:
         print()
@@ -63,44 +63,43 @@ fi
 echo -e "${GREEN}✓ AWS CLI configured${NC}"
 echo ""
 
-# Step 1: Create deployment package
-echo "Step 1: Creating deployment package..."
+# Step 1: Build layer.zip (dependencies) and function.zip (source only)
+echo "Step 1: Building deployment packages..."
 echo "----------------------------------------"
 
-# Clean previous builds
-echo "Cleaning up previous builds..."
-rm -rf package
-rm -f lambda-deployment.zip
+python3 deploy.py
 
-# Create package directory
-mkdir -p package
+echo ""
 
-# Install dependencies
-echo "Installing dependencies..."
-pip install -r requirements.txt -t package/ --quiet
+# Step 2: Publish the dependency layer when it changed
+echo "Step 2: Publishing dependency layer..."
+echo "----------------------------------------"
 
-# Copy source code
-echo "Copying source code..."
-cp -r src package/
-cp lambda_function.py package/
+LAYER_NAME="${FUNCTION_NAME}-dependencies"
+LAYER_ARN_FILE="layer.zip.arn"
+LAYER_PUBLISHED_HASH_FILE="layer.zip.published"
 
-# Copy config if exists (optional - Lambda should use env vars)
-if [ -d "config" ]; then
-    cp -r config package/
+if [ -f "$LAYER_ARN_FILE" ] && [ "$(cat layer.zip.sha256)" = "$(cat "$LAYER_PUBLISHED_HASH_FILE" 2>/dev/null)" ]; then
+    LAYER_ARN=$(cat "$LAYER_ARN_FILE")
+    echo -e "${GREEN}✓ Layer unchanged, reusing ${LAYER_ARN}${NC}"
+else
+    LAYER_ARN=$(aws lambda publish-layer-version \
+        --layer-name "$LAYER_NAME" \
+        --description "Dependencies for $FUNCTION_NAME" \
+        --zip-file fileb://layer.zip \
+        --compatible-runtimes "$RUNTIME" \
+        --region "$REGION" \
+        --query LayerVersionArn \
+        --output text)
+    echo "$LAYER_ARN" > "$LAYER_ARN_FILE"
+    cp layer.zip.sha256 "$LAYER_PUBLISHED_HASH_FILE"
+    echo -e "${GREEN}✓ Layer published: ${LAYER_ARN}${NC}"
 fi
 
-# Create zip file
-echo "Creating deployment zip..."
-cd package
-zip -r ../lambda-deployment.zip . -q
-cd ..
-
-ZIP_SIZE=$(du -h lambda-deployment.zip | cut -f1)
-echo -e "${GREEN}✓ Deployment package created: lambda-deployment.zip (${ZIP_SIZE})${NC}"
 echo ""
 
-# Step 2: Check if Lambda function exists
-echo "Step 2: Checking Lambda function status..."
+# Step 3: Check if Lambda function exists
+echo "Step 3: Checking Lambda function status..."
 echo "----------------------------------------"
 
 FUNCTION_EXISTS=$(aws lambda get-function --function-name "$FUNCTION_NAME" --region "$REGION" 2>&1 || true)
@@ -135,7 +134,8 @@ if echo "$FUNCTION_EXISTS" | grep -q "ResourceNotFoundException"; then
         --memory-size "$MEMORY_SIZE" \
         --timeout "$TIMEOUT" \
         --description "$DESCRIPTION" \
-        --zip-file fileb://lambda-deployment.zip \
+        --zip-file fileb://function.zip \
+        --layers "$LAYER_ARN" \
         --vpc-config SubnetIds="${SUBNET_IDS}",SecurityGroupIds="${SECURITY_GROUP_IDS}" \
         --environment "{\"Variables\":{\"DB_HOST\":\"${DB_HOST}\",\"DB_NAME\":\"${DB_NAME}\",\"DB_USER\":\"${DB_USER}\",\"DB_PASSWORD\":\"${DB_PASSWORD}\",\"DB_PORT\":\"${DB_PORT}\",\"CHUNK_SIZE\":\"${CHUNK_SIZE}\",\"BATCH_COMMIT_SIZE\":\"${BATCH_COMMIT_SIZE}\"}}" \
         --region "$REGION" \
@@ -148,7 +148,7 @@ else
     # Update function code
     aws lambda update-function-code \
         --function-name "$FUNCTION_NAME" \
-        --zip-file fileb://lambda-deployment.zip \
+        --zip-file fileb://function.zip \
         --region "$REGION" \
         --output text > /dev/null
 
@@ -166,6 +166,7 @@ else
         --memory-size "$MEMORY_SIZE" \
         --timeout "$TIMEOUT" \
         --description "$DESCRIPTION" \
+        --layers "$LAYER_ARN" \
         --vpc-config SubnetIds="${SUBNET_IDS}",SecurityGroupIds="${SECURITY_GROUP_IDS}" \
         --environment "{\"Variables\":{\"DB_HOST\":\"${DB_HOST}\",\"DB_NAME\":\"${DB_NAME}\",\"DB_USER\":\"${DB_USER}\",\"DB_PASSWORD\":\"${DB_PASSWORD}\",\"DB_PORT\":\"${DB_PORT}\",\"CHUNK_SIZE\":\"${CHUNK_SIZE}\",\"BATCH_COMMIT_SIZE\":\"${BATCH_COMMIT_SIZE}\"}}" \
         --region "$REGION" \
@@ -184,6 +185,7 @@ echo "Region:   $REGION"
 echo "Runtime:  $RUNTIME"
 echo "Memory:   ${MEMORY_SIZE}MB"
 echo "Timeout:  ${TIMEOUT}s"
+echo "Layer:    ${LAYER_ARN}"
 echo "VPC:      Subnets: ${SUBNET_IDS}"
 echo "          Security Groups: ${SECURITY_GROUP_IDS}"
 echo ""
@@ -5,14 +5,264 @@ This Lambda function reads Facebook posts and comments from PostgreSQL,
 generates RAG-ready text chunks, and loads them into the facebook_chunks table.
 """
 
+import queue
+import threading
+from itertools import islice
+
 from src.config_manager import ConfigManager
-from src.database_reader import DatabaseReader
 from src.chunk_generator import ChunkGenerator
-from src.database_writer import DatabaseWriter
-from src.logger import get_logger
+from src.logger import flush_logs, get_logger
 
 logger = get_logger(__name__)
 
+# Number of posts whose comments are fetched together in one query
+POST_BATCH_SIZE = 1000
+
+# Number of chunk batches buffered between the producer thread and the inserts
+PIPELINE_DEPTH = 2
+
+
+def _load_config_manager():
+    """
+    Load and validate the application configuration.
+
+    Returns:
+        ConfigManager: Validated configuration
+
+    Raises:
+        ValueError: If required configuration is missing
+    """
+    config_manager = ConfigManager()
+    config_manager.validate()
+    return config_manager
+
+
+# Load configuration once per container so warm invocations skip re-parsing.
+# A failure here is retried (and reported) by the first invocation.
+try:
+    _config_manager = _load_config_manager()
+except Exception as e:
+    logger.warning(f"Deferred configuration loading to first invocation: {e}")
+    _config_manager = None
+
+
+def _get_config_manager():
+    """
+    Return the cached configuration, loading it if not loaded yet.
+
+    Returns:
+        ConfigManager: Validated configuration
+    """
+    global _config_manager
+    if _config_manager is None:
+        _config_manager = _load_config_manager()
+    return _config_manager
+
+
+# Database connections reused across warm invocations of the same container
+_db_reader = None
+_db_writer = None
+
+
+def _get_db_connections(db_config, batch_commit_size, writer_connections=1):
+    """
+    Return a connected reader and writer, reusing those of a previous invocation.
+
+    Cached connections are checked before reuse and replaced if the server
+    dropped them while the container was idle.
+
+    Args:
+        db_config (dict): Database configuration
+        batch_commit_size (int): Number of inserts before committing
+        writer_connections (int): Number of connections the writer inserts with
+
+    Returns:
+        tuple: (DatabaseReader, DatabaseWriter), both connected
+    """
+    global _db_reader, _db_writer
+
+    # Imported here so psycopg2 is only loaded once a database is needed
+    from src.database_reader import DatabaseReader
+    from src.database_writer import DatabaseWriter
+
+    if _db_reader is None or not _db_reader.is_connected():
+        if _db_reader is not None:
+            # Close the dead reader's connection before replacing it
+            try:
+                _db_reader.disconnect()
+            except Exception:
+                pass
+
+        logger.info("Connecting to database (reader)...")
+        _db_reader = DatabaseReader(db_config)
+        _db_reader.connect()
+    else:
+        logger.info("Reusing database connection (reader)")
+
+    if _db_writer is None or not _db_writer.is_connected():
+        if _db_writer is not None:
+            # Release the dead writer's pool and threads before replacing it
+            try:
+                _db_writer.disconnect()
+            except Exception:
+                pass
+
+        logger.info("Connecting to database (writer)...")
+        _db_writer = DatabaseWriter(
+            db_config, batch_commit_size=batch_commit_size, pool_size=writer_connections
+        )
+        _db_writer.connect()
+    else:
+        logger.info("Reusing database connection (writer)")
+
+    return _db_reader, _db_writer
+
+
+def _close_db_connections():
+    """
+    Close and forget the cached database connections, ignoring errors.
+    """
+    global _db_reader, _db_writer
+
+    for db in (_db_reader, _db_writer):
+        if db:
+            try:
+                db.disconnect()
+            except Exception:
+                pass
+
+    _db_reader = None
+    _db_writer = None
+
+
+def _batched(iterable, size):
+    """
+    Split an iterable into lists of at most ``size`` items.
+
+    Args:
+        iterable: Any iterable (consumed lazily)
+        size (int): Maximum number of items per batch
+
+    Yields:
+        list: Next batch of items
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _generate_chunks(db_reader, chunk_generator):
+    """
+    Stream posts from the reader and generate one chunk per post.
+
+    Args:
+        db_reader (DatabaseReader): Connected reader
+        chunk_generator (ChunkGenerator): Generator used to build chunks
+
+    Yields:
+        dict: Chunk dictionary, in post order
+    """
+    posts_processed = 0
+
+    for post_batch in _batched(db_reader.iter_posts(), POST_BATCH_SIZE):
+        # Fetch comments for the whole batch in one round-trip
+        comments_by_post = db_reader.get_comments_grouped_by_post(
+            [post.get('post_id') for post in post_batch]
+        )
+
+        comments_lists = [
+            comments_by_post.get(post.get('post_id'), []) for post in post_batch
+        ]
+        # Engagement counts every comment, including those the query skipped
+        comment_counts = [post.get('comment_count') for post in post_batch]
+
+        yield from map(chunk_generator.generate_chunk, post_batch, comments_lists, comment_counts)
+
+        posts_processed += len(post_batch)
+        logger.info(f"Processed {posts_processed} posts...")
+
+
+def _produce_chunk_batches(db_reader, chunk_generator, batch_size, batches, stop, errors):
+    """
+    Producer thread body: put batches of generated chunks on a queue.
+
+    A None sentinel is always put last so the consumer knows to stop.
+    Exceptions are recorded in ``errors`` for the consumer to re-raise.
+    """
+    try:
+        chunks = _generate_chunks(db_reader, chunk_generator)
+        for chunk_batch in _batched(chunks, batch_size):
+            if stop.is_set():
+                return
+            batches.put(chunk_batch)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        batches.put(None)
+
+
+def _run_pipeline(db_reader, db_writer, chunk_generator, batch_size):
+    """
+    Overlap reading/chunk generation with inserting.
+
+    A producer thread streams posts and generates chunks while the calling
+    thread inserts each batch of ``batch_size`` chunks. The queue between
+    them holds at most PIPELINE_DEPTH batches, which bounds memory usage.
+
+    Args:
+        db_reader (DatabaseReader): Connected reader
+        db_writer (DatabaseWriter): Connected writer
+        chunk_generator (ChunkGenerator): Generator used to build chunks
+        batch_size (int): Number of chunks per insert batch
+
+    Returns:
+        tuple: (posts_processed, insert_stats) where insert_stats has
+               total, success and failed counts
+    """
+    batches = queue.Queue(maxsize=PIPELINE_DEPTH)
+    stop = threading.Event()
+    errors = []
+    producer = threading.Thread(
+        target=_produce_chunk_batches,
+        args=(db_reader, chunk_generator, batch_size, batches, stop, errors),
+        name="chunk-producer",
+        daemon=True
+    )
+
+    posts_processed = 0
+    insert_stats = {'total': 0, 'success': 0, 'failed': 0}
+
+    producer.start()
+    try:
+        while True:
+            chunk_batch = batches.get()
+            if chunk_batch is None:
+                break
+
+            # One chunk is generated per post
+            posts_processed += len(chunk_batch)
+            batch_stats = db_writer.insert_chunks_batch(chunk_batch)
+            for key in insert_stats:
+                insert_stats[key] += batch_stats[key]
+
+    finally:
+        # Unblock the producer if we are bailing out early
+        stop.set()
+        while producer.is_alive():
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        producer.join()
+
+    if errors:
+        raise errors[0]
+
+    return posts_processed, insert_stats
+
 
 def lambda_handler(event, context):
     """
@@ -35,21 +285,25 @@ def lambda_handler(event, context):
     try:
         # 1. Load Configuration
         logger.info("Step 1: Loading configuration...")
-        config_manager = ConfigManager()
-        config_manager.validate()
+        config_manager = _get_config_manager()
 
         db_config = config_manager.get_database_config()
         chunk_size = config_manager.get_chunk_size()
         batch_commit_size = config_manager.get_batch_commit_size()
+        writer_connections = config_manager.get_writer_connections()
 
-        logger.info(f"Configuration: chunk_size={chunk_size}, batch_commit_size={batch_commit_size}")
+        logger.info(
+            f"Configuration: chunk_size={chunk_size}, batch_commit_size={batch_commit_size}, "
+            f"writer_connections={writer_connections}"
+        )
 
-        # 2. Initialize Database Reader
-        logger.info("Step 2: Connecting to database (reader)...")
-        db_reader = DatabaseReader(db_config)
-        db_reader.connect()
+        # 2. Connect to Database (reader and writer)
+        logger.info("Step 2: Connecting to database...")
+        db_reader, db_writer = _get_db_connections(db_config, batch_commit_size, writer_connections)
 
-        # Verify tables exist
+        # 3. Verify Tables Exist (posts, comments and facebook_chunks in one query;
+        #    the writer does not re-check, a missing table fails its first insert)
+        logger.info("Step 3: Verifying database tables...")
         if not db_reader.verify_tables_exist():
             error_msg = "Required database tables do not exist"
             logger.error(error_msg)
@@ -58,13 +312,26 @@ def lambda_handler(event, context):
                 'body': {'error': error_msg}
             }
 
-        # 3. Read All Posts
-        logger.info("Step 3: Reading all posts from database...")
-        posts = db_reader.get_all_posts()
+        # 4. Initialize Chunk Generator
+        logger.info("Step 4: Initializing chunk generator...")
+        chunk_generator = ChunkGenerator(chunk_size=chunk_size)
 
-        if not posts:
+        # 5. Stream Posts, Generate Chunks and Insert them as they are produced
+        logger.info("Step 5: Processing posts and inserting chunks...")
+        if writer_connections > 1:
+            # Batches are split across pooled connections, each shard committing on its own
+            posts_processed, insert_stats = _run_pipeline(
+                db_reader, db_writer, chunk_generator, batch_commit_size
+            )
+        else:
+            # All batches are committed together when the run completes
+            with db_writer.transaction():
+                posts_processed, insert_stats = _run_pipeline(
+                    db_reader, db_writer, chunk_generator, batch_commit_size
+                )
+
+        if posts_processed == 0:
             logger.warning("No posts found in database")
-            db_reader.disconnect()
             return {
                 'statusCode': 200,
                 'body': {
@@ -74,64 +341,12 @@ def lambda_handler(event, context):
                 }
             }
 
-        logger.info(f"Found {len(posts)} posts to process")
-
-        # 4. Initialize Chunk Generator
-        logger.info("Step 4: Initializing chunk generator...")
-        chunk_generator = ChunkGenerator(chunk_size=chunk_size)
-
-        # 5. Process Posts and Generate Chunks
-        logger.info("Step 5: Processing posts and generating chunks...")
-        chunks_to_insert = []
-
-        for i, post in enumerate(posts, 1):
-            post_id = post.get('post_id')
-
-            # Get comments for this post
-            comments = db_reader.get_comments_for_post(post_id)
-
-            # Generate chunk
-            chunk = chunk_generator.generate_chunk(post, comments)
-            chunks_to_insert.append(chunk)
-
-            if i % 100 == 0:
-                logger.info(f"Processed {i}/{len(posts)} posts...")
-
-        logger.info(f"Generated {len(chunks_to_insert)} chunks")
-
-        # Close reader connection
-        db_reader.disconnect()
-        db_reader = None
-
-        # 6. Initialize Database Writer
-        logger.info("Step 6: Connecting to database (writer)...")
-        db_writer = DatabaseWriter(db_config, batch_commit_size=batch_commit_size)
-        db_writer.connect()
-
-        # Verify chunks table exists
-        if not db_writer.verify_table_exists():
-            error_msg = "facebook_chunks table does not exist"
-            logger.error(error_msg)
-            return {
-                'statusCode': 500,
-                'body': {'error': error_msg}
-            }
-
-        # 7. Insert Chunks
-        logger.info("Step 7: Inserting chunks into database...")
-        insert_stats = db_writer.insert_chunks_batch(chunks_to_insert)
-
-        # 8. Disconnect Writer
-        logger.info("Step 8: Closing database connection...")
-        db_writer.disconnect()
-        db_writer = None
-
-        # 9. Prepare Response
+        # 6. Prepare Response
         response = {
             'statusCode': 200,
             'body': {
                 'message': 'ETL process completed successfully',
-                'posts_processed': len(posts),
+                'posts_processed': posts_processed,
                 'chunks_created': insert_stats['success'],
                 'chunks_failed': insert_stats['failed'],
                 'total_chunks': insert_stats['total']
@@ -140,7 +355,7 @@ def lambda_handler(event, context):
 
         logger.info("=" * 80)
         logger.info("Lambda function execution completed successfully")
-        logger.info(f"Posts processed: {len(posts)}")
+        logger.info(f"Posts processed: {posts_processed}")
         logger.info(f"Chunks created: {insert_stats['success']}/{insert_stats['total']}")
         logger.info("=" * 80)
 
@@ -151,18 +366,10 @@ def lambda_handler(event, context):
         logger.error(f"Lambda function execution failed: {str(e)}")
         logger.error("=" * 80)
 
-        # Clean up connections
-        if db_reader:
-            try:
-                db_reader.disconnect()
-            except:
-                pass
-
-        if db_writer:
-            try:
-                db_writer.disconnect()
-            except:
-                pass
+        # Drop connections, they may be left in an unusable state
+        _close_db_connections()
+        db_reader = None
+        db_writer = None
 
         return {
             'statusCode': 500,
@@ -172,6 +379,19 @@ def lambda_handler(event, context):
             }
         }
 
+    finally:
+        # Leave reused connections idle rather than inside an open transaction
+        if db_reader and db_writer:
+            try:
+                db_reader.end_transaction()
+                db_writer.end_transaction()
+            except Exception as e:
+                logger.warning(f"Failed to end transactions, dropping connections: {e}")
+                _close_db_connections()
+
+        # Write out queued log records before Lambda freezes the container
+        flush_logs()
+
 
 # For local testing
 if __name__ == "__main__":
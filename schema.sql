@@ -41,9 +41,13 @@ CREATE TABLE IF NOT EXISTS comments (
 
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_posts_timestamp ON posts(timestamp);
-CREATE INDEX IF NOT EXISTS idx_comments_post_id ON comments(post_id);
 CREATE INDEX IF NOT EXISTS idx_comments_timestamp ON comments(timestamp);
 CREATE INDEX IF NOT EXISTS idx_comments_author ON comments(author);
+-- Matches the ORDER BY of the comment queries, so comments are read pre-sorted.
+-- Its leading post_id column also serves plain post_id lookups, which makes
+-- the former single-column index redundant.
+CREATE INDEX IF NOT EXISTS idx_comments_post_priority_length ON comments(post_id, comment_priority ASC, text_length ASC);
+DROP INDEX IF EXISTS idx_comments_post_id;
 
 -- ============================================================================
 -- Example UPSERT Queries (used by the Lambda function)
@@ -2,10 +2,26 @@
 Chunk generator for creating RAG-ready text chunks from posts and comments.
 """
 
+import re
+from operator import itemgetter
+
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# A word is any run of non-whitespace characters, matching str.split()
+WORD_PATTERN = re.compile(r'\S+')
+
+# Extracts the text from a comment dictionary
+COMMENT_TEXTS = itemgetter('comment_texts')
+
+# Chunk section prefixes; the metadata section is always present
+METADATA_PREFIX = "metadata: [Post_id: "
+TITLE_PREFIX = "Title: "
+QUESTION_PREFIX = "Question (priority 1): "
+ANSWER_PREFIX = "Important answer (priority 2): "
+OTHER_COMMENTS_PREFIX = "Other comments (priority 3): "
+
 
 class ChunkGenerator:
     """
@@ -25,13 +41,16 @@ class ChunkGenerator:
         self.chunk_size = chunk_size
         logger.info(f"ChunkGenerator initialized with chunk_size={chunk_size}")
 
-    def generate_chunk(self, post, comments):
+    def generate_chunk(self, post, comments, comment_count=None):
         """
         Generate a formatted chunk from a post and its comments.
 
         Args:
             post (dict): Post dictionary with fields: post_id, timestamp, author, title, post_texts
-            comments (list): List of comment dictionaries ordered by priority and text_length
+            comments (list): List of comment dictionaries with non-empty comment_texts,
+                ordered by priority and text_length
+            comment_count (int): Total number of comments for the post, including
+                those without text; defaults to len(comments)
 
         Returns:
             dict: Dictionary containing:
@@ -40,61 +59,49 @@ class ChunkGenerator:
                 - full_chunk: The generated text chunk
                 - engagement_score: Total number of comments
         """
-        # Build the chunk components
-        components = []
+        # Read each field once; the reader always provides every column
+        post_id = post['post_id']
+        timestamp = post['timestamp']
+        author = post['author']
+        title = post['title']
+        post_texts = post['post_texts']
+
+        delimiter = self.DELIMITER
 
         # 1. Metadata section
-        author_prefix = (post.get('author', '')[:5]) if post.get('author') else ''
-        metadata = (
-            f"metadata: [Post_id: {post.get('post_id', '')} | "
-            f"Timestamp: {post.get('timestamp', '')} | "
-            f"Author: {author_prefix}]"
+        parts = (
+            METADATA_PREFIX, str(post_id),
+            " | Timestamp: ", str(timestamp),
+            " | Author: ", author[:5] if author else '', "]"
         )
-        components.append(metadata)
 
         # 2. Title section
-        if post.get('title'):
-            title_section = f"Title: {post.get('title')}"
-            components.append(title_section)
+        if title:
+            parts += (delimiter, TITLE_PREFIX, title)
 
         # 3. Question section (post content)
-        if post.get('post_texts'):
-            question_section = f"Question (priority 1): {post.get('post_texts')}"
-            components.append(question_section)
+        if post_texts:
+            parts += (delimiter, QUESTION_PREFIX, post_texts)
 
         # 4. Important answer section (first comment only)
-        if comments and len(comments) > 0:
-            first_comment = comments[0].get('comment_texts', '')
-            if first_comment:
-                important_answer = f"Important answer (priority 2): {first_comment}"
-                components.append(important_answer)
-
-        # 5. Other comments section (remaining comments)
-        if comments and len(comments) > 1:
-            other_comments_texts = []
-            for comment in comments[1:]:
-                comment_text = comment.get('comment_texts', '')
-                if comment_text:
-                    other_comments_texts.append(comment_text)
-
-            if other_comments_texts:
-                # Concatenate other comments with delimiter
-                other_comments_concat = self.DELIMITER.join(other_comments_texts)
-                other_comments_section = f"Other comments (priority 3): {other_comments_concat}"
-                components.append(other_comments_section)
-
-        # Concatenate all components with delimiter
-        full_text = self.DELIMITER.join(components)
+        if comments:
+            parts += (delimiter, ANSWER_PREFIX, comments[0]['comment_texts'])
+
+        # 5. Other comments section (remaining comments, concatenated with delimiter)
+        if len(comments) > 1:
+            parts += (delimiter, OTHER_COMMENTS_PREFIX, delimiter.join(map(COMMENT_TEXTS, comments[1:])))
+
+        full_text = ''.join(parts)
 
         # Truncate to chunk_size words
         truncated_chunk = self._truncate_to_words(full_text, self.chunk_size)
 
         # Calculate engagement score (total number of comments)
-        engagement_score = len(comments)
+        engagement_score = len(comments) if comment_count is None else comment_count
 
         result = {
-            'post_id': post.get('post_id'),
-            'timestamp': post.get('timestamp'),
+            'post_id': post_id,
+            'timestamp': timestamp,
             'full_chunk': truncated_chunk,
             'engagement_score': engagement_score
         }
@@ -110,23 +117,26 @@ class ChunkGenerator:
             max_words (int): Maximum number of words
 
         Returns:
-            str: Truncated text
+            str: Truncated text, with its original whitespace preserved
         """
-        if not text:
+        if not text or max_words <= 0:
             return ""
 
-        words = text.split()
-
-        if len(words) <= max_words:
+        # Words need at least one separator between them, so short texts
+        # cannot exceed the limit and need no scanning at all
+        if (len(text) + 1) // 2 <= max_words:
             return text
 
-        # Take only the first max_words words
-        truncated_words = words[:max_words]
-        truncated_text = ' '.join(truncated_words)
-
-        logger.debug(f"Truncated text from {len(words)} words to {max_words} words")
+        # Find word boundaries lazily and cut right after the max_words-th word
+        for count, match in enumerate(WORD_PATTERN.finditer(text), 1):
+            if count == max_words:
+                end = match.end()
+                if WORD_PATTERN.search(text, end) is None:
+                    return text
+                logger.debug(f"Truncated text to {max_words} words")
+                return text[:end]
 
-        return truncated_text
+        return text
 
     def generate_chunks_batch(self, posts_with_comments):
         """
@@ -3,6 +3,7 @@ Configuration manager for loading and validating application configuration.
 Supports both JSON config files (local) and environment variables (Lambda).
 """
 
+import copy
 import json
 import os
 from pathlib import Path
@@ -16,22 +17,41 @@ class ConfigManager:
     Manages application configuration from JSON files or environment variables.
     """
 
-    def __init__(self, config_file=None):
+    def __init__(self, config_file=None, config_dict=None):
         """
         Initialize ConfigManager.
 
         Args:
             config_file (str, optional): Path to config JSON file. If None, uses env vars.
+            config_dict (dict, optional): Configuration to use instead of reading a
+                file. Environment variables still override it.
         """
         self.config = {}
         self.config_file = config_file or os.getenv('CONFIG_FILE', 'config/config.json')
-        self._load_config()
+        self._load_config(config_dict)
 
-    def _load_config(self):
+    def _load_config(self, config_dict=None):
         """
         Load configuration from file or environment variables.
-        Priority: Environment variables > Config file
+        Priority: Environment variables > Config dict > Config file
+
+        Inside AWS Lambda, configuration comes from environment variables only,
+        so the config file is not probed at all.
+
+        Args:
+            config_dict (dict, optional): Configuration that replaces the config file
         """
+        if config_dict is not None:
+            # Copied so environment overrides never modify the caller's dict
+            self.config = copy.deepcopy(config_dict)
+            self._load_from_env()
+            return
+
+        if os.getenv('AWS_LAMBDA_FUNCTION_NAME'):
+            logger.info("Running in AWS Lambda, using environment variables")
+            self._load_from_env()
+            return
+
         # Try loading from config file first
         if os.path.exists(self.config_file):
             try:
@@ -62,6 +82,11 @@ class ConfigManager:
             self.config['database']['port'] = int(os.getenv('DB_PORT', '5432'))
             logger.info("Database configuration loaded from environment variables")
 
+        if os.getenv('DB_BULK_MODE'):
+            if 'database' not in self.config:
+                self.config['database'] = {}
+            self.config['database']['bulk_mode'] = os.getenv('DB_BULK_MODE').lower() in ('1', 'true', 'yes')
+
         # Processing configuration
         if os.getenv('CHUNK_SIZE'):
             if 'processing' not in self.config:
@@ -73,6 +98,11 @@ class ConfigManager:
                 self.config['processing'] = {}
             self.config['processing']['batch_commit_size'] = int(os.getenv('BATCH_COMMIT_SIZE', '1000'))
 
+        if os.getenv('WRITER_CONNECTIONS'):
+            if 'processing' not in self.config:
+                self.config['processing'] = {}
+            self.config['processing']['writer_connections'] = int(os.getenv('WRITER_CONNECTIONS'))
+
         # AWS configuration
         if os.getenv('AWS_REGION'):
             if 'aws' not in self.config:
@@ -130,6 +160,15 @@ class ConfigManager:
         """
         return self.config.get('processing', {}).get('batch_commit_size', 1000)
 
+    def get_writer_connections(self):
+        """
+        Get number of connections used to insert chunk batches concurrently.
+
+        Returns:
+            int: Number of writer connections (1 disables parallel inserts)
+        """
+        return self.config.get('processing', {}).get('writer_connections', 1)
+
     def get_aws_region(self):
         """
         Get AWS region.
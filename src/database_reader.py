@@ -2,7 +2,11 @@
 Database reader for fetching posts and comments from PostgreSQL.
 """
 
+from itertools import groupby
+from operator import itemgetter
+
 import psycopg2
+from psycopg2.extras import RealDictCursor
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -38,9 +42,15 @@ class DatabaseReader:
                 database=self.db_config.get("database"),
                 user=self.db_config.get("username"),
                 password=self.db_config.get("password"),
-                port=self.db_config.get("port", 5432)
+                port=self.db_config.get("port", 5432),
+                # TCP keepalives stop NAT/VPC idle timeouts from silently
+                # dropping the connection between or during invocations
+                keepalives=1,
+                keepalives_idle=30,
+                keepalives_interval=10,
+                keepalives_count=3
             )
-            self.cursor = self.connection.cursor()
+            self.cursor = self.connection.cursor(cursor_factory=RealDictCursor)
             logger.info(f"Connected to database: {self.db_config.get('database')}")
 
         except psycopg2.Error as e:
@@ -55,44 +65,86 @@ class DatabaseReader:
             self.connection.close()
         logger.info("Database connection closed")
 
-    def get_all_posts(self):
+    def is_connected(self):
         """
-        Retrieve all posts from the database.
+        Check that the connection is open and still usable.
 
         Returns:
-            list: List of post dictionaries with all fields
+            bool: True if a trivial query succeeds on the connection
         """
+        if self.connection is None or self.connection.closed:
+            return False
+
         try:
-            query = """
-                SELECT post_id, timestamp, author, title, post_texts, text_length
-                FROM posts
-                ORDER BY post_id;
-            """
-            self.cursor.execute(query)
-            rows = self.cursor.fetchall()
-
-            posts = []
-            for row in rows:
-                post = {
-                    'post_id': row[0],
-                    'timestamp': row[1],
-                    'author': row[2],
-                    'title': row[3],
-                    'post_texts': row[4],
-                    'text_length': row[5]
-                }
-                posts.append(post)
-
-            logger.info(f"Retrieved {len(posts)} posts from database")
-            return posts
+            self.cursor.execute("SELECT 1;")
+            self.cursor.fetchall()
+            return True
+        except (psycopg2.InterfaceError, psycopg2.OperationalError) as e:
+            logger.warning(f"Database connection is no longer usable: {e}")
+            return False
+
+    def end_transaction(self):
+        """
+        End the current read transaction so the connection can sit idle between invocations.
+        """
+        self.connection.rollback()
+
+    def iter_posts(self, itersize=5000):
+        """
+        Stream all posts from the database using a server-side cursor.
+
+        Rows are fetched from PostgreSQL in batches of ``itersize``, so memory
+        usage stays bounded regardless of the size of the posts table. Posts
+        are returned in no particular order, which avoids sorting the table.
+        Each post carries ``comment_count``, the number of all its comments
+        (including those without text, which the comment queries skip).
+
+        Args:
+            itersize (int): Number of rows fetched per network round-trip
+
+        Yields:
+            dict: Post dictionary with all fields
+        """
+        query = """
+            SELECT p.post_id, p.timestamp, p.author, p.title, p.post_texts, p.text_length,
+                   (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.post_id) AS comment_count
+            FROM posts p;
+        """
+        cursor = self.connection.cursor(name='posts_stream', cursor_factory=RealDictCursor)
+        cursor.itersize = itersize
+
+        try:
+            cursor.execute(query)
+
+            count = 0
+            for post in cursor:
+                count += 1
+                yield post
+
+            logger.info(f"Streamed {count} posts from database")
 
         except psycopg2.Error as e:
             logger.error(f"Failed to fetch posts: {e}")
             raise
 
+        finally:
+            cursor.close()
+
+    def get_all_posts(self):
+        """
+        Retrieve all posts from the database.
+
+        Prefer iter_posts() for large tables; this materializes every row.
+
+        Returns:
+            list: List of post dictionaries with all fields
+        """
+        return list(self.iter_posts())
+
     def get_comments_for_post(self, post_id):
         """
         Retrieve all comments for a specific post, ordered by priority and text length.
+        Comments without text are skipped.
 
         Args:
             post_id (str): The post ID to fetch comments for
@@ -106,30 +158,54 @@ class DatabaseReader:
                        comment_priority, text_length
                 FROM comments
                 WHERE post_id = %s
+                  AND comment_texts IS NOT NULL AND comment_texts <> ''
                 ORDER BY comment_priority ASC, text_length ASC;
             """
             self.cursor.execute(query, (post_id,))
-            rows = self.cursor.fetchall()
-
-            comments = []
-            for row in rows:
-                comment = {
-                    'comment_id': row[0],
-                    'post_id': row[1],
-                    'timestamp': row[2],
-                    'author': row[3],
-                    'comment_texts': row[4],
-                    'comment_priority': row[5],
-                    'text_length': row[6]
-                }
-                comments.append(comment)
-
-            return comments
+            return self.cursor.fetchall()
 
         except psycopg2.Error as e:
             logger.error(f"Failed to fetch comments for post {post_id}: {e}")
             raise
 
+    def get_comments_grouped_by_post(self, post_ids):
+        """
+        Retrieve comments for many posts in a single query, grouped by post.
+        Comments without text are skipped.
+
+        Args:
+            post_ids (list): Post IDs to fetch comments for
+
+        Returns:
+            dict: Mapping of post_id to its list of comment dictionaries,
+                  each list ordered by comment_priority, then text_length.
+                  Posts without comments are absent from the mapping.
+        """
+        if not post_ids:
+            return {}
+
+        try:
+            query = """
+                SELECT comment_id, post_id, timestamp, author, comment_texts,
+                       comment_priority, text_length
+                FROM comments
+                WHERE post_id = ANY(%s)
+                  AND comment_texts IS NOT NULL AND comment_texts <> ''
+                ORDER BY post_id, comment_priority ASC, text_length ASC;
+            """
+            self.cursor.execute(query, (list(post_ids),))
+
+            comments_by_post = {}
+            for post_id, comments in groupby(self.cursor, key=itemgetter('post_id')):
+                comments_by_post[post_id] = list(comments)
+
+            logger.info(f"Retrieved comments for {len(comments_by_post)} of {len(post_ids)} posts")
+            return comments_by_post
+
+        except psycopg2.Error as e:
+            logger.error(f"Failed to fetch comments for {len(post_ids)} posts: {e}")
+            raise
+
     def verify_tables_exist(self):
         """
         Verify that required tables (posts, comments, facebook_chunks) exist in the database.
@@ -140,18 +216,19 @@ class DatabaseReader:
         try:
             required_tables = ['posts', 'comments', 'facebook_chunks']
 
-            for table_name in required_tables:
-                self.cursor.execute("""
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.tables
-                        WHERE table_name = %s
-                    );
-                """, (table_name,))
-                exists = self.cursor.fetchone()[0]
-
-                if not exists:
+            # Check all tables in a single round-trip
+            self.cursor.execute("""
+                SELECT table_name
+                FROM information_schema.tables
+                WHERE table_name = ANY(%s);
+            """, (required_tables,))
+            found_tables = {row['table_name'] for row in self.cursor.fetchall()}
+
+            missing_tables = [name for name in required_tables if name not in found_tables]
+            if missing_tables:
+                for table_name in missing_tables:
                     logger.error(f"Required table '{table_name}' does not exist in database")
-                    return False
+                return False
 
             logger.info("Verified: all required tables exist")
             return True
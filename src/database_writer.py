@@ -2,33 +2,121 @@
 Database writer for inserting chunks into PostgreSQL.
 """
 
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime
+from operator import itemgetter
+
 import psycopg2
+from psycopg2.errors import UndefinedTable
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Session settings applied when db_config enables bulk_mode. Commits stop
+# waiting for the WAL flush, so a server crash can lose the last few
+# transactions; acceptable because the chunks are rebuilt from posts/comments.
+BULK_MODE_OPTIONS = "-c synchronous_commit=off -c work_mem=64MB"
+
+# Projects a chunk dictionary onto the facebook_chunks column order
+CHUNK_COLUMNS = itemgetter('post_id', 'timestamp', 'full_chunk', 'engagement_score')
+
+# Characters that must be backslash-escaped in COPY text format
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def _format_copy_value(value):
+    """
+    Format a value as a field of a COPY text-format row.
+
+    Args:
+        value: Column value (None, str, int or datetime)
+
+    Returns:
+        str: Escaped field, or \\N for NULL
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+
+def _build_copy_buffer(rows):
+    """
+    Serialize rows into a COPY text-format buffer.
+
+    Args:
+        rows (list): Row tuples in CHUNK_COLUMNS order
+
+    Returns:
+        io.StringIO: Buffer positioned at the start, one line per row
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(map(_format_copy_value, row)))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
 
 class DatabaseWriter:
     """
     Handles writing chunks to PostgreSQL database with batch commits.
     """
 
-    def __init__(self, db_config, batch_commit_size=1000):
+    # Statements built once at class level rather than on every call
+    INSERT_SQL = (
+        "INSERT INTO facebook_chunks (post_id, timestamp, full_chunk, engagement_score) "
+        "VALUES ($1, $2, $3, $4)"
+    )
+    PREPARE_INSERT_SQL = "PREPARE insert_chunk (varchar, timestamp, text, integer) AS " + INSERT_SQL
+    EXECUTE_INSERT_SQL = "EXECUTE insert_chunk (%s, %s, %s, %s)"
+    MULTI_INSERT_SQL = "INSERT INTO facebook_chunks (post_id, timestamp, full_chunk, engagement_score) VALUES %s"
+    COPY_SQL = "COPY facebook_chunks (post_id, timestamp, full_chunk, engagement_score) FROM STDIN"
+
+    def __init__(self, db_config, batch_commit_size=1000, pool_size=1, log_level=None):
         """
         Initialize DatabaseWriter with database configuration.
 
         Args:
             db_config (dict): Database configuration containing host, database, username, password, port
             batch_commit_size (int): Number of inserts before committing (default: 1000)
+            pool_size (int): Number of connections used to insert shards of a
+                batch concurrently; 1 disables parallel inserts (default: 1)
+            log_level (int): Level for this module's logger, e.g. logging.WARNING
+                to silence per-batch INFO messages during bulk runs. The logger
+                is shared by all writers; None leaves it unchanged (default: None)
         """
+        if log_level is not None:
+            logger.setLevel(log_level)
+
         self.db_config = db_config
         self.batch_commit_size = batch_commit_size
+        self.pool_size = pool_size
         self.connection = None
         self.cursor = None
+        self.pool = None
+        self.executor = None
         self.insert_count = 0
         self.total_inserted = 0
         self.total_failed = 0
-        logger.info(f"DatabaseWriter initialized with batch_commit_size={batch_commit_size}")
+        self._in_transaction = False
+        # Prepared statements live as long as the session that created them
+        self._insert_prepared = False
+        logger.info(
+            "DatabaseWriter initialized with batch_commit_size=%d, pool_size=%d",
+            batch_commit_size, pool_size
+        )
 
     def connect(self):
         """
@@ -38,37 +126,108 @@ class DatabaseWriter:
             psycopg2.Error: If connection fails
         """
         try:
-            self.connection = psycopg2.connect(
-                host=self.db_config.get("host"),
-                database=self.db_config.get("database"),
-                user=self.db_config.get("username"),
-                password=self.db_config.get("password"),
-                port=self.db_config.get("port", 5432)
-            )
+            self.connection = psycopg2.connect(**self._connection_params())
             self.cursor = self.connection.cursor()
-            logger.info(f"Connected to database: {self.db_config.get('database')}")
+            self._insert_prepared = False
+
+            if self.pool_size > 1:
+                self.pool = ThreadedConnectionPool(1, self.pool_size, **self._connection_params())
+                self.executor = ThreadPoolExecutor(max_workers=self.pool_size)
+
+            logger.info("Connected to database: %s", self.db_config.get('database'))
 
         except psycopg2.Error as e:
-            logger.error(f"Failed to connect to database: {e}")
+            logger.error("Failed to connect to database: %s", e)
             raise
 
+    def _connection_params(self):
+        """
+        Build keyword arguments for psycopg2.connect from the database configuration.
+
+        Returns:
+            dict: Connection parameters
+        """
+        params = {
+            'host': self.db_config.get("host"),
+            'database': self.db_config.get("database"),
+            'user': self.db_config.get("username"),
+            'password': self.db_config.get("password"),
+            'port': self.db_config.get("port", 5432),
+            # TCP keepalives stop NAT/VPC idle timeouts from silently
+            # dropping the connection between or during invocations
+            'keepalives': 1,
+            'keepalives_idle': 30,
+            'keepalives_interval': 10,
+            'keepalives_count': 3
+        }
+
+        # Passed as startup options so pooled connections get them too
+        if self.db_config.get("bulk_mode"):
+            params['options'] = BULK_MODE_OPTIONS
+
+        return params
+
     def disconnect(self):
         """Close database connection."""
-        # Final commit for any remaining records
+        try:
+            # Final commit for any remaining records
+            if self.insert_count > 0:
+                self._commit()
+
+        finally:
+            # Release the pool and threads even if the final commit failed
+            if self.executor:
+                self.executor.shutdown()
+            if self.pool and not self.pool.closed:
+                self.pool.closeall()
+            if self.cursor:
+                self.cursor.close()
+            if self.connection:
+                self.connection.close()
+            logger.info("Database connection closed")
+
+    def is_connected(self):
+        """
+        Check that the connection is open and still usable.
+
+        Pooled connections are not pinged here; a shard that finds its pooled
+        connection broken retries on a new one (see _insert_shard).
+
+        Returns:
+            bool: True if a trivial query succeeds on the connection
+        """
+        if self.connection is None or self.connection.closed:
+            return False
+        if self.pool is not None and self.pool.closed:
+            return False
+
+        try:
+            self.cursor.execute("SELECT 1;")
+            self.cursor.fetchall()
+            return True
+        except (psycopg2.InterfaceError, psycopg2.OperationalError) as e:
+            logger.warning("Database connection is no longer usable: %s", e)
+            return False
+
+    def end_transaction(self):
+        """
+        Commit any pending inserts and end the open transaction so the
+        connection can sit idle between invocations.
+        """
         if self.insert_count > 0:
             self._commit()
-
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
-        logger.info("Database connection closed")
+        else:
+            self.connection.rollback()
 
     def insert_chunk(self, chunk):
         """
         Insert a single chunk into the facebook_chunks table.
         Commits automatically every batch_commit_size inserts.
 
+        Each call waits for its own server round-trip (psycopg2 cannot
+        pipeline statements), so loading many chunks should go through
+        insert_chunks_batch, which sends a whole batch at once.
+
         Args:
             chunk (dict): Chunk dictionary with post_id, timestamp, full_chunk, engagement_score
 
@@ -76,20 +235,9 @@ class DatabaseWriter:
             bool: True if successful, False otherwise
         """
         try:
-            insert_query = """
-                INSERT INTO facebook_chunks (post_id, timestamp, full_chunk, engagement_score)
-                VALUES (%s, %s, %s, %s);
-            """
-
-            self.cursor.execute(
-                insert_query,
-                (
-                    chunk.get('post_id'),
-                    chunk.get('timestamp'),
-                    chunk.get('full_chunk'),
-                    chunk.get('engagement_score')
-                )
-            )
+            self._prepare_insert()
+
+            self.cursor.execute(self.EXECUTE_INSERT_SQL, CHUNK_COLUMNS(chunk))
 
             self.insert_count += 1
 
@@ -100,14 +248,165 @@ class DatabaseWriter:
             return True
 
         except psycopg2.Error as e:
-            logger.error(f"Failed to insert chunk for post {chunk.get('post_id')}: {e}")
-            self.connection.rollback()
+            logger.error("Failed to insert chunk for post %s: %s", chunk.get('post_id'), e)
+            self._rollback_batch()
             self.total_failed += 1
+            if self._in_transaction:
+                raise
             return False
 
-    def insert_chunks_batch(self, chunks):
+    def _prepare_insert(self):
+        """
+        Prepare the single-row insert once per session, so the server parses
+        and plans it only once instead of on every insert_chunk call.
+        """
+        if self._insert_prepared:
+            return
+
+        self.cursor.execute(self.PREPARE_INSERT_SQL)
+        self._insert_prepared = True
+
+    def insert_chunks_bulk(self, chunks):
+        """
+        Insert chunks with multi-row INSERT statements, committed together.
+
+        Rows are sent with psycopg2's execute_values, one statement per page of
+        batch_commit_size rows, and committed once at the end.
+
+        Args:
+            chunks (list): List of chunk dictionaries
+
+        Returns:
+            int: Number of rows inserted, summed over all pages
+
+        Raises:
+            psycopg2.Error: If any page fails; all of the chunks are rolled back
+        """
+        return self._insert_rows_bulk(list(map(CHUNK_COLUMNS, chunks)))
+
+    def _insert_rows_bulk(self, rows):
+        """
+        Insert row tuples with execute_values; see insert_chunks_bulk.
+        """
+        inserted = 0
+
+        try:
+            for start in range(0, len(rows), self.batch_commit_size):
+                page = rows[start:start + self.batch_commit_size]
+                execute_values(
+                    self.cursor,
+                    self.MULTI_INSERT_SQL,
+                    page,
+                    template="(%s, %s, %s, %s)",
+                    page_size=len(page)
+                )
+                # rowcount only reflects the last statement, so count per page
+                inserted += self.cursor.rowcount
+
+            self.insert_count += inserted
+            self._commit()
+
+        except psycopg2.Error:
+            self._rollback_batch()
+            raise
+
+        return inserted
+
+    def insert_chunks_copy(self, chunks):
+        """
+        Insert chunks by streaming them through COPY ... FROM STDIN, committed together.
+
+        Args:
+            chunks (list): List of chunk dictionaries
+
+        Returns:
+            int: Number of rows inserted
+
+        Raises:
+            psycopg2.Error: If the COPY fails; all of the chunks are rolled back
+        """
+        return self._insert_rows_copy(list(map(CHUNK_COLUMNS, chunks)))
+
+    def _insert_rows_copy(self, rows):
+        """
+        Insert row tuples with COPY; see insert_chunks_copy.
+        """
+        try:
+            self.cursor.copy_expert(
+                self.COPY_SQL,
+                _build_copy_buffer(rows)
+            )
+            self.insert_count += len(rows)
+            self._commit()
+
+        except psycopg2.Error:
+            self._rollback_batch()
+            raise
+
+        return len(rows)
+
+    def _insert_shard(self, rows, retry=True):
+        """
+        Insert one shard of a batch on a pooled connection, in its own transaction.
+
+        The shard is streamed with COPY and retried with execute_values if that
+        fails, like the single-connection path. Pooled connections are not
+        checked before reuse, so a shard whose connection turns out to be
+        broken is retried once on a fresh one.
+
+        Args:
+            rows (list): Row tuples in CHUNK_COLUMNS order
+            retry (bool): Whether to retry once after a connection failure
+
+        Returns:
+            int: Number of rows inserted
+
+        Raises:
+            psycopg2.Error: If the shard cannot be inserted; it is rolled back
         """
-        Insert multiple chunks.
+        connection = self.pool.getconn()
+        broken = False
+        try:
+            with connection.cursor() as cursor:
+                try:
+                    cursor.copy_expert(self.COPY_SQL, _build_copy_buffer(rows))
+                except (UndefinedTable, psycopg2.InterfaceError, psycopg2.OperationalError):
+                    raise
+                except psycopg2.Error as e:
+                    logger.warning("COPY failed, retrying shard with INSERT: %s", e)
+                    connection.rollback()
+                    execute_values(
+                        cursor,
+                        self.MULTI_INSERT_SQL,
+                        rows,
+                        template="(%s, %s, %s, %s)",
+                        page_size=len(rows)
+                    )
+            connection.commit()
+            return len(rows)
+
+        except (psycopg2.InterfaceError, psycopg2.OperationalError) as e:
+            # Discard the connection rather than returning it to the pool
+            broken = True
+            if not retry:
+                raise
+            logger.warning("Pooled connection failed, retrying shard on a new connection: %s", e)
+
+        except psycopg2.Error:
+            connection.rollback()
+            raise
+
+        finally:
+            self.pool.putconn(connection, close=broken)
+
+        return self._insert_shard(rows, retry=False)
+
+    def insert_chunks_parallel(self, chunks):
+        """
+        Insert a batch as pool_size shards, each COPYed concurrently on its own connection.
+
+        Each shard commits independently, so a failed shard does not affect the others.
+        Without a connection pool (pool_size == 1) this is insert_chunks_batch.
 
         Args:
             chunks (list): List of chunk dictionaries
@@ -115,20 +414,106 @@ class DatabaseWriter:
         Returns:
             dict: Statistics about the insertion (total, success, failed)
         """
+        if self.pool is None:
+            return self.insert_chunks_batch(chunks)
+
+        return self._insert_rows_parallel(list(map(CHUNK_COLUMNS, chunks)))
+
+    def _insert_rows_parallel(self, rows):
+        """
+        Insert row tuples as concurrent shards; see insert_chunks_parallel.
+        """
+        if not rows:
+            return {'total': 0, 'success': 0, 'failed': 0}
+
+        shard_size = -(-len(rows) // self.pool_size)
+        shards = [rows[start:start + shard_size] for start in range(0, len(rows), shard_size)]
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Split %d rows into shards of %s", len(rows), [len(shard) for shard in shards])
+
+        futures = [self.executor.submit(self._insert_shard, shard) for shard in shards]
+
         success_count = 0
         failed_count = 0
+        for shard, future in zip(shards, futures):
+            try:
+                success_count += future.result()
+            except UndefinedTable:
+                logger.error("facebook_chunks table does not exist in database")
+                raise
+            except psycopg2.Error as e:
+                logger.error("Failed to insert shard of %d chunks: %s", len(shard), e)
+                failed_count += len(shard)
 
-        logger.info(f"Inserting {len(chunks)} chunks into database")
+        self.total_inserted += success_count
+        self.total_failed += failed_count
 
-        for chunk in chunks:
-            if self.insert_chunk(chunk):
-                success_count += 1
-            else:
-                failed_count += 1
+        return {
+            'total': len(rows),
+            'success': success_count,
+            'failed': failed_count
+        }
 
-        # Ensure any remaining records are committed
-        if self.insert_count > 0:
-            self._commit()
+    def insert_chunks_batch(self, chunks):
+        """
+        Insert multiple chunks in bulk.
+
+        With a connection pool (pool_size > 1) and outside transaction(), the
+        batch is split into shards inserted concurrently. Otherwise chunks are
+        streamed with COPY; if that fails they are retried with multi-row
+        INSERTs. If both fail, the whole batch is rolled back and
+        counted as failed. Inside transaction() a failure cannot be isolated
+        to the batch, so the error is raised instead.
+
+        The table is assumed to exist rather than verified up front; a missing
+        table is detected by the first insert and always raised.
+
+        Args:
+            chunks (list): List of chunk dictionaries
+
+        Returns:
+            dict: Statistics about the insertion (total, success, failed)
+
+        Raises:
+            psycopg2.errors.UndefinedTable: If facebook_chunks does not exist
+        """
+        logger.info("Inserting %d chunks into database", len(chunks))
+
+        # Project to tuples once; every insert path below consumes them as-is
+        rows = list(map(CHUNK_COLUMNS, chunks))
+
+        # Shards need their own transactions, so a shared one rules them out
+        if self.pool and rows and not self._in_transaction:
+            stats = self._insert_rows_parallel(rows)
+            logger.info("Chunk insertion complete: %s", stats)
+            return stats
+
+        try:
+            try:
+                success_count = self._insert_rows_copy(rows)
+            except UndefinedTable:
+                raise
+            except psycopg2.Error as e:
+                if self._in_transaction:
+                    raise
+                logger.warning("COPY failed, retrying batch with INSERT: %s", e)
+                success_count = self._insert_rows_bulk(rows)
+            failed_count = len(chunks) - success_count
+
+        except UndefinedTable:
+            self.total_failed += len(chunks)
+            logger.error("facebook_chunks table does not exist in database")
+            raise
+
+        except psycopg2.Error as e:
+            logger.error("Failed to insert batch of %d chunks: %s", len(chunks), e)
+            self.total_failed += len(chunks)
+            if self._in_transaction:
+                raise
+
+            success_count = 0
+            failed_count = len(chunks)
 
         stats = {
             'total': len(chunks),
@@ -136,21 +521,63 @@ class DatabaseWriter:
             'failed': failed_count
         }
 
-        logger.info(f"Chunk insertion complete: {stats}")
+        logger.info("Chunk insertion complete: %s", stats)
         return stats
 
+    @contextmanager
+    def transaction(self):
+        """
+        Group every insert made inside the block into one transaction.
+
+        Periodic commits are deferred and a single commit is issued when the
+        block exits, so PostgreSQL flushes WAL once instead of once per batch.
+        Any failed insert aborts the whole transaction: the error propagates
+        and every row inserted in the block is rolled back, including rows of
+        batches that had already succeeded.
+
+        Raises:
+            psycopg2.Error: If an insert or the final commit fails
+        """
+        self._in_transaction = True
+        try:
+            yield self
+        except BaseException:
+            self._in_transaction = False
+            self.connection.rollback()
+            self.insert_count = 0
+            raise
+
+        self._in_transaction = False
+        self._commit()
+
+    def _rollback_batch(self):
+        """
+        Roll back after a failed insert.
+
+        Inside transaction() nothing is done here: the failure has aborted the
+        shared transaction, which transaction() rolls back once the error
+        leaves the block.
+        """
+        if not self._in_transaction:
+            self.connection.rollback()
+            self.insert_count = 0
+
     def _commit(self):
         """
         Commit current transaction and reset insert counter.
+        Deferred to the end of the block while inside transaction().
         """
+        if self._in_transaction:
+            return
+
         try:
             self.connection.commit()
             self.total_inserted += self.insert_count
-            logger.info(f"Committed {self.insert_count} records (total: {self.total_inserted})")
+            logger.info("Committed %d records (total: %d)", self.insert_count, self.total_inserted)
             self.insert_count = 0
 
         except psycopg2.Error as e:
-            logger.error(f"Failed to commit transaction: {e}")
+            logger.error("Failed to commit transaction: %s", e)
             self.connection.rollback()
             raise
 
@@ -174,12 +601,9 @@ class DatabaseWriter:
             bool: True if table exists, False otherwise
         """
         try:
-            self.cursor.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables
-                    WHERE table_name = 'facebook_chunks'
-                );
-            """)
+            # Resolved through search_path like the inserts themselves, using
+            # the catalog cache instead of querying information_schema
+            self.cursor.execute("SELECT to_regclass('facebook_chunks') IS NOT NULL;")
             exists = self.cursor.fetchone()[0]
 
             if exists:
@@ -190,5 +614,5 @@ class DatabaseWriter:
                 return False
 
         except psycopg2.Error as e:
-            logger.error(f"Failed to verify table: {e}")
+            logger.error("Failed to verify table: %s", e)
             return False
@@ -2,8 +2,51 @@
 Centralized logging configuration for the Lambda function.
 """
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+
+
+def _create_stream_handler():
+    """
+    Create the stdout handler that actually writes log records.
+
+    Returns:
+        logging.StreamHandler: Formatted handler writing to stdout
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setLevel(logging.INFO)
+
+    # Create formatter
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    handler.setFormatter(formatter)
+
+    return handler
+
+
+# Loggers only enqueue records; a background thread writes them to stdout,
+# so logging calls never block on I/O
+_log_queue = queue.Queue(-1)
+_listener = QueueListener(_log_queue, _create_stream_handler(), respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+
+
+def flush_logs():
+    """
+    Block until every queued log record has been written.
+
+    Lambda freezes the container as soon as the handler returns, so call this
+    before returning to get the invocation's logs out in time.
+    """
+    # Stopping drains the queue and joins the writer thread
+    _listener.stop()
+    _listener.start()
 
 
 def get_logger(name):
@@ -22,18 +65,7 @@ def get_logger(name):
     if not logger.handlers:
         logger.setLevel(logging.INFO)
 
-        # Create console handler
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(logging.INFO)
-
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        handler.setFormatter(formatter)
-
-        # Add handler to logger
-        logger.addHandler(handler)
+        # Hand records to the shared queue instead of writing them here
+        logger.addHandler(QueueHandler(_log_queue))
 
     return logger
@@ -3,14 +3,30 @@ Unit tests for ChunkGenerator module.
 Tests the chunk generation logic without requiring a database connection.
 """
 
-import sys
-sys.path.insert(0, '.')
+from datetime import datetime
+
+import pytest
 
 from src.chunk_generator import ChunkGenerator
-from datetime import datetime
 
+# Long texts for the truncation tests, built once at import
+LONG_POST_TEXT = " ".join(f"Word{i}" for i in range(500))
+LONG_COMMENT_TEXT = " ".join(f"Comment{i}" for i in range(300))
+
+
+@pytest.fixture(scope="module")
+def chunk_gen():
+    """ChunkGenerator with the default test chunk size, shared by the module."""
+    return ChunkGenerator(chunk_size=700)
+
+
+@pytest.fixture
+def sized_chunk_gen(request):
+    """ChunkGenerator whose chunk size comes from indirect parametrization."""
+    return ChunkGenerator(chunk_size=request.param)
 
-def test_basic_chunk_generation():
+
+def test_basic_chunk_generation(chunk_gen):
     """Test basic chunk generation with post and comments."""
     print("\n" + "="*80)
     print("TEST 1: Basic Chunk Generation")
@@ -48,8 +64,7 @@ def test_basic_chunk_generation():
     ]
 
     # Generate chunk
-    chunk_generator = ChunkGenerator(chunk_size=700)
-    chunk = chunk_generator.generate_chunk(post, comments)
+    chunk = chunk_gen.generate_chunk(post, comments)
 
     # Verify results
     assert chunk['post_id'] == 'POST_001', "Post ID mismatch"
@@ -71,10 +86,8 @@ def test_basic_chunk_generation():
     print(chunk['full_chunk'])
     print("--- End of Chunk ---\n")
 
-    return True
-
 
-def test_chunk_with_no_comments():
+def test_chunk_with_no_comments(chunk_gen):
     """Test chunk generation when post has no comments."""
     print("\n" + "="*80)
     print("TEST 2: Chunk Generation with No Comments")
@@ -90,8 +103,7 @@ def test_chunk_with_no_comments():
 
     comments = []
 
-    chunk_generator = ChunkGenerator(chunk_size=700)
-    chunk = chunk_generator.generate_chunk(post, comments)
+    chunk = chunk_gen.generate_chunk(post, comments)
 
     assert chunk['post_id'] == 'POST_002', "Post ID mismatch"
     assert chunk['engagement_score'] == 0, f"Expected engagement score 0, got {chunk['engagement_score']}"
@@ -107,10 +119,8 @@ def test_chunk_with_no_comments():
     print(chunk['full_chunk'])
     print("--- End of Chunk ---\n")
 
-    return True
 
-
-def test_chunk_with_one_comment():
+def test_chunk_with_one_comment(chunk_gen):
     """Test chunk generation when post has only one comment."""
     print("\n" + "="*80)
     print("TEST 3: Chunk Generation with One Comment")
@@ -133,8 +143,7 @@ def test_chunk_with_one_comment():
         }
     ]
 
-    chunk_generator = ChunkGenerator(chunk_size=700)
-    chunk = chunk_generator.generate_chunk(post, comments)
+    chunk = chunk_gen.generate_chunk(post, comments)
 
     assert chunk['post_id'] == 'POST_003', "Post ID mismatch"
     assert chunk['engagement_score'] == 1, f"Expected engagement score 1, got {chunk['engagement_score']}"
@@ -149,39 +158,35 @@ def test_chunk_with_one_comment():
     print(chunk['full_chunk'])
     print("--- End of Chunk ---\n")
 
-    return True
-
 
-def test_chunk_truncation():
+@pytest.mark.slow
+@pytest.mark.parametrize("sized_chunk_gen", [50], indirect=True)
+def test_chunk_truncation(sized_chunk_gen):
     """Test that chunks are truncated to specified word count."""
     print("\n" + "="*80)
     print("TEST 4: Chunk Truncation")
     print("="*80)
 
-    # Create a post with very long text
-    long_text = " ".join([f"Word{i}" for i in range(500)])
-
     post = {
         'post_id': 'POST_004',
         'timestamp': datetime(2026, 1, 13, 13, 0, 0),
         'author': 'TestUser',
         'title': 'Long Post',
-        'post_texts': long_text
+        'post_texts': LONG_POST_TEXT
     }
 
     comments = [
         {
             'comment_id': 'COMMENT_005',
-            'comment_texts': " ".join([f"Comment{i}" for i in range(300)]),
+            'comment_texts': LONG_COMMENT_TEXT,
             'comment_priority': 1,
             'text_length': 300
         }
     ]
 
-    # Set a small chunk size
-    chunk_size = 50
-    chunk_generator = ChunkGenerator(chunk_size=chunk_size)
-    chunk = chunk_generator.generate_chunk(post, comments)
+    # Small chunk size from the parametrized fixture
+    chunk_size = sized_chunk_gen.chunk_size
+    chunk = sized_chunk_gen.generate_chunk(post, comments)
 
     word_count = len(chunk['full_chunk'].split())
 
@@ -196,10 +201,8 @@ def test_chunk_truncation():
     print(chunk['full_chunk'][:500] + "...")
     print("--- End of Preview ---\n")
 
-    return True
-
 
-def test_author_prefix():
+def test_author_prefix(chunk_gen):
     """Test that author name is correctly truncated to 5 characters."""
     print("\n" + "="*80)
     print("TEST 5: Author Prefix Truncation")
@@ -213,8 +216,7 @@ def test_author_prefix():
         'post_texts': 'Testing author prefix.'
     }
 
-    chunk_generator = ChunkGenerator(chunk_size=700)
-    chunk = chunk_generator.generate_chunk(post, [])
+    chunk = chunk_gen.generate_chunk(post, [])
 
     assert 'Author: VeryL]' in chunk['full_chunk'], "Author should be truncated to first 5 characters"
     assert 'VeryLongAuthorName' not in chunk['full_chunk'], "Full author name should not appear"
@@ -229,54 +231,60 @@ def test_author_prefix():
     print(lines[0])
     print("--- End of Metadata ---\n")
 
-    return True
-
 
-def run_all_tests():
-    """Run all unit tests."""
+@pytest.mark.parametrize("sized_chunk_gen", [20], indirect=True)
+def test_truncation_preserves_delimiters(sized_chunk_gen):
+    """Test that truncation keeps the original whitespace and section delimiters."""
     print("\n" + "="*80)
-    print("RUNNING CHUNK GENERATOR UNIT TESTS")
+    print("TEST 6: Truncation Preserves Delimiters")
     print("="*80)
 
-    tests = [
-        ("Basic Chunk Generation", test_basic_chunk_generation),
-        ("No Comments", test_chunk_with_no_comments),
-        ("One Comment", test_chunk_with_one_comment),
-        ("Chunk Truncation", test_chunk_truncation),
-        ("Author Prefix", test_author_prefix),
-    ]
+    post = {
+        'post_id': 'POST_006',
+        'timestamp': datetime(2026, 1, 13, 15, 0, 0),
+        'author': 'Delim',
+        'title': 'Delimiter Check',
+        'post_texts': " ".join(f"Word{i}" for i in range(100))
+    }
+
+    chunk_size = sized_chunk_gen.chunk_size
+    chunk = sized_chunk_gen.generate_chunk(post, [])
+
+    word_count = len(chunk['full_chunk'].split())
+
+    assert word_count == chunk_size, f"Expected {chunk_size} words, got {word_count}"
+    assert ChunkGenerator.DELIMITER + "Title: Delimiter Check" in chunk['full_chunk'], "Delimiter should survive truncation"
+    assert sized_chunk_gen._truncate_to_words("one two  three", 3) == "one two  three", "Text within limit should be unchanged"
+    assert sized_chunk_gen._truncate_to_words("one\ntwo three", 2) == "one\ntwo", "Cut should keep original whitespace"
 
-    passed = 0
-    failed = 0
-
-    for test_name, test_func in tests:
-        try:
-            test_func()
-            passed += 1
-        except AssertionError as e:
-            print(f"\n✗ TEST FAILED: {test_name}")
-            print(f"  Error: {e}")
-            failed += 1
-        except Exception as e:
-            print(f"\n✗ TEST ERROR: {test_name}")
-            print(f"  Exception: {e}")
-            failed += 1
+    print("\n✓ Truncation preserves delimiters!")
+    print(f"  Word count: {word_count} words")
 
+
+def test_engagement_counts_comments_without_text(chunk_gen):
+    """Test that engagement uses the total comment count, not just comments with text."""
     print("\n" + "="*80)
-    print("TEST SUMMARY")
+    print("TEST 7: Engagement Counts All Comments")
     print("="*80)
-    print(f"Total Tests: {len(tests)}")
-    print(f"Passed: {passed} ✓")
-    print(f"Failed: {failed} ✗")
 
-    if failed == 0:
-        print("\n🎉 ALL TESTS PASSED! 🎉")
-        return 0
-    else:
-        print(f"\n⚠️  {failed} TEST(S) FAILED")
-        return 1
+    post = {
+        'post_id': 'POST_007',
+        'timestamp': datetime(2026, 1, 13, 16, 0, 0),
+        'author': 'Count',
+        'title': 'Engagement Check',
+        'post_texts': 'Two of the four comments have no text.'
+    }
+    comments = [
+        {'comment_id': 'COMMENT_001', 'comment_texts': 'First answer.'},
+        {'comment_id': 'COMMENT_002', 'comment_texts': 'Second answer.'}
+    ]
+
+    chunk = chunk_gen.generate_chunk(post, comments, comment_count=4)
+    no_text_chunk = chunk_gen.generate_chunk(post, [], comment_count=2)
 
+    assert chunk['engagement_score'] == 4, f"Expected engagement score 4, got {chunk['engagement_score']}"
+    assert no_text_chunk['engagement_score'] == 2, f"Expected engagement score 2, got {no_text_chunk['engagement_score']}"
+    assert 'Important answer (priority 2): First answer.' in chunk['full_chunk'], "First comment with text should be the answer"
 
-if __name__ == "__main__":
-    import sys
-    sys.exit(run_all_tests())
+    print("\n✓ Engagement counts comments without text!")
+    print(f"  Engagement Score: {chunk['engagement_score']}")
@@ -3,12 +3,12 @@ Unit tests for ConfigManager module.
 Tests configuration loading and validation.
 """
 
-import sys
-sys.path.insert(0, '.')
-
 import os
 import json
 import tempfile
+
+import pytest
+
 from src.config_manager import ConfigManager
 
 
@@ -75,8 +75,6 @@ def test_config_loading_from_file():
         # Clean up
         os.unlink(temp_config_file)
 
-    return True
-
 
 def test_config_validation_success():
     """Test successful configuration validation."""
@@ -97,23 +95,13 @@ def test_config_validation_success():
         }
     }
 
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(config_data, f)
-        temp_config_file = f.name
+    config_manager = ConfigManager(config_dict=config_data)
 
-    try:
-        config_manager = ConfigManager(config_file=temp_config_file)
+    # Should not raise exception
+    config_manager.validate()
 
-        # Should not raise exception
-        config_manager.validate()
-
-        print("\n✓ Configuration validation passed!")
-        print("  All required fields are present")
-
-    finally:
-        os.unlink(temp_config_file)
-
-    return True
+    print("\n✓ Configuration validation passed!")
+    print("  All required fields are present")
 
 
 def test_config_validation_missing_database():
@@ -128,24 +116,13 @@ def test_config_validation_missing_database():
         }
     }
 
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(config_data, f)
-        temp_config_file = f.name
-
-    try:
-        config_manager = ConfigManager(config_file=temp_config_file)
+    config_manager = ConfigManager(config_dict=config_data)
 
-        # Should raise ValueError
-        try:
-            config_manager.validate()
-            print("\n✗ Validation should have failed!")
-            return False
-        except ValueError as e:
-            print(f"\n✓ Validation correctly failed: {e}")
-            return True
+    # Should raise ValueError
+    with pytest.raises(ValueError) as excinfo:
+        config_manager.validate()
 
-    finally:
-        os.unlink(temp_config_file)
+    print(f"\n✓ Validation correctly failed: {excinfo.value}")
 
 
 def test_config_validation_missing_fields():
@@ -164,34 +141,24 @@ def test_config_validation_missing_fields():
         }
     }
 
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(config_data, f)
-        temp_config_file = f.name
+    config_manager = ConfigManager(config_dict=config_data)
 
-    try:
-        config_manager = ConfigManager(config_file=temp_config_file)
+    # Should raise ValueError
+    with pytest.raises(ValueError) as excinfo:
+        config_manager.validate()
 
-        # Should raise ValueError
-        try:
-            config_manager.validate()
-            print("\n✗ Validation should have failed!")
-            return False
-        except ValueError as e:
-            print(f"\n✓ Validation correctly failed: {e}")
-            assert "database" in str(e).lower() or "username" in str(e).lower(), "Error message should mention missing field"
-            return True
-
-    finally:
-        os.unlink(temp_config_file)
+    print(f"\n✓ Validation correctly failed: {excinfo.value}")
+    error = str(excinfo.value).lower()
+    assert "database" in error or "username" in error, "Error message should mention missing field"
 
 
 def test_config_env_override():
-    """Test that environment variables override config file values."""
+    """Test that environment variables override configured values."""
     print("\n" + "="*80)
     print("TEST 5: Environment Variable Override")
     print("="*80)
 
-    # Create config file with default values
+    # Base configuration that the environment overrides
     config_data = {
         "database": {
             "host": "file-host.com",
@@ -205,10 +172,6 @@ def test_config_env_override():
         }
     }
 
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(config_data, f)
-        temp_config_file = f.name
-
     try:
         # Set environment variables
         os.environ['DB_HOST'] = 'env-host.com'
@@ -218,7 +181,7 @@ def test_config_env_override():
         os.environ['DB_PORT'] = '3306'
         os.environ['CHUNK_SIZE'] = '999'
 
-        config_manager = ConfigManager(config_file=temp_config_file)
+        config_manager = ConfigManager(config_dict=config_data)
 
         # Test that env vars override file values
         db_config = config_manager.get_database_config()
@@ -226,6 +189,7 @@ def test_config_env_override():
         assert db_config['database'] == 'env_db', "Env var should override file"
         assert db_config['port'] == 3306, "Env var should override file"
         assert config_manager.get_chunk_size() == 999, "Env var should override file"
+        assert config_data['database']['host'] == 'file-host.com', "Caller's dict should not be modified"
 
         print("\n✓ Environment variables correctly override config file!")
         print(f"  File Host: 'file-host.com' → Env Host: '{db_config['host']}'")
@@ -234,8 +198,6 @@ def test_config_env_override():
         print(f"  File Chunk Size: 300 → Env Chunk Size: {config_manager.get_chunk_size()}")
 
     finally:
-        # Clean up
-        os.unlink(temp_config_file)
         del os.environ['DB_HOST']
         del os.environ['DB_NAME']
         del os.environ['DB_USER']
@@ -243,8 +205,6 @@ def test_config_env_override():
         del os.environ['DB_PORT']
         del os.environ['CHUNK_SIZE']
 
-    return True
-
 
 def test_config_defaults():
     """Test default values when optional fields are missing."""
@@ -268,80 +228,62 @@ def test_config_defaults():
         # Missing admin_list
     }
 
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        json.dump(config_data, f)
-        temp_config_file = f.name
-
-    try:
-        config_manager = ConfigManager(config_file=temp_config_file)
+    config_manager = ConfigManager(config_dict=config_data)
 
-        # Test default values
-        assert config_manager.get_batch_commit_size() == 1000, "Default batch size should be 1000"
-        assert config_manager.get_aws_region() == 'us-east-1', "Default region should be us-east-1"
-        assert config_manager.get_admin_list() == [], "Default admin list should be empty"
+    # Test default values
+    assert config_manager.get_batch_commit_size() == 1000, "Default batch size should be 1000"
+    assert config_manager.get_aws_region() == 'us-east-1', "Default region should be us-east-1"
+    assert config_manager.get_admin_list() == [], "Default admin list should be empty"
 
-        print("\n✓ Default values working correctly!")
-        print(f"  Default Batch Commit Size: {config_manager.get_batch_commit_size()}")
-        print(f"  Default AWS Region: {config_manager.get_aws_region()}")
-        print(f"  Default Admin List: {config_manager.get_admin_list()}")
-
-    finally:
-        os.unlink(temp_config_file)
-
-    return True
+    print("\n✓ Default values working correctly!")
+    print(f"  Default Batch Commit Size: {config_manager.get_batch_commit_size()}")
+    print(f"  Default AWS Region: {config_manager.get_aws_region()}")
+    print(f"  Default Admin List: {config_manager.get_admin_list()}")
 
 
-def run_all_tests():
-    """Run all configuration tests."""
+def test_config_lambda_skips_file():
+    """Test that the config file is ignored when running inside AWS Lambda."""
     print("\n" + "="*80)
-    print("RUNNING CONFIGURATION MANAGER UNIT TESTS")
+    print("TEST 7: Lambda Environment Skips Config File")
     print("="*80)
 
-    tests = [
-        ("Load Config from File", test_config_loading_from_file),
-        ("Valid Config Validation", test_config_validation_success),
-        ("Missing Database Config", test_config_validation_missing_database),
-        ("Missing Database Fields", test_config_validation_missing_fields),
-        ("Environment Variable Override", test_config_env_override),
-        ("Default Values", test_config_defaults),
-    ]
-
-    passed = 0
-    failed = 0
-
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            if result:
-                passed += 1
-            else:
-                failed += 1
-        except AssertionError as e:
-            print(f"\n✗ TEST FAILED: {test_name}")
-            print(f"  Error: {e}")
-            failed += 1
-        except Exception as e:
-            print(f"\n✗ TEST ERROR: {test_name}")
-            print(f"  Exception: {e}")
-            import traceback
-            traceback.print_exc()
-            failed += 1
+    config_data = {
+        "database": {
+            "host": "file-host.com",
+            "database": "file_db",
+            "username": "file_user",
+            "password": "file_pass",
+            "port": 5432
+        },
+        "processing": {
+            "chunk_size": 300
+        }
+    }
+
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+        json.dump(config_data, f)
+        temp_config_file = f.name
 
-    print("\n" + "="*80)
-    print("TEST SUMMARY")
-    print("="*80)
-    print(f"Total Tests: {len(tests)}")
-    print(f"Passed: {passed} ✓")
-    print(f"Failed: {failed} ✗")
+    try:
+        os.environ['AWS_LAMBDA_FUNCTION_NAME'] = 'facebook-chunks-etl'
+        os.environ['DB_HOST'] = 'env-host.com'
+        os.environ['DB_NAME'] = 'env_db'
+        os.environ['DB_USER'] = 'env_user'
+        os.environ['DB_PASSWORD'] = 'env_pass'
 
-    if failed == 0:
-        print("\n🎉 ALL TESTS PASSED! 🎉")
-        return 0
-    else:
-        print(f"\n⚠️  {failed} TEST(S) FAILED")
-        return 1
+        config_manager = ConfigManager(config_file=temp_config_file)
 
+        db_config = config_manager.get_database_config()
+        assert db_config['host'] == 'env-host.com', "Host should come from environment"
+        assert 'processing' not in config_manager.config, "Config file should not be read in Lambda"
 
-if __name__ == "__main__":
-    import sys
-    sys.exit(run_all_tests())
+        print("\n✓ Config file skipped inside Lambda!")
+        print(f"  Database Host: {db_config['host']}")
+
+    finally:
+        os.unlink(temp_config_file)
+        del os.environ['AWS_LAMBDA_FUNCTION_NAME']
+        del os.environ['DB_HOST']
+        del os.environ['DB_NAME']
+        del os.environ['DB_USER']
+        del os.environ['DB_PASSWORD']
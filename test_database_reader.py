@@ -0,0 +1,72 @@
+"""
+Unit tests for DatabaseReader comment grouping.
+Tests the grouped comment query handling with a fake cursor instead of a database.
+"""
+
+from src.database_reader import DatabaseReader
+
+
+class FakeCursor:
+    """Cursor that records the executed query and iterates over canned rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+def _comment(post_id, comment_id):
+    return {'post_id': post_id, 'comment_id': comment_id, 'comment_texts': f"Text {comment_id}"}
+
+
+def test_comments_grouped_by_post():
+    """Test that rows ordered by post_id are grouped per post in their original order."""
+    print("\n" + "="*80)
+    print("TEST 1: Comments Grouped by Post")
+    print("="*80)
+
+    rows = [
+        _comment('POST_A', 'C1'),
+        _comment('POST_A', 'C2'),
+        _comment('POST_B', 'C3'),
+        _comment('POST_D', 'C4'),
+        _comment('POST_D', 'C5'),
+        _comment('POST_D', 'C6'),
+    ]
+
+    reader = DatabaseReader({})
+    reader.cursor = FakeCursor(rows)
+
+    comments_by_post = reader.get_comments_grouped_by_post(('POST_A', 'POST_B', 'POST_C', 'POST_D'))
+
+    assert list(comments_by_post) == ['POST_A', 'POST_B', 'POST_D'], "Posts without comments should be absent"
+    assert [c['comment_id'] for c in comments_by_post['POST_A']] == ['C1', 'C2'], "POST_A comments mismatch"
+    assert [c['comment_id'] for c in comments_by_post['POST_B']] == ['C3'], "POST_B comments mismatch"
+    assert [c['comment_id'] for c in comments_by_post['POST_D']] == ['C4', 'C5', 'C6'], "POST_D comments mismatch"
+
+    query, params = reader.cursor.executed[0]
+    assert "ORDER BY post_id" in query, "Grouping relies on rows ordered by post_id"
+    assert params == (['POST_A', 'POST_B', 'POST_C', 'POST_D'],), "Post IDs should be passed as one list parameter"
+
+    print("\n✓ Comments grouped correctly!")
+    print(f"  Groups: { {post_id: len(comments) for post_id, comments in comments_by_post.items()} }")
+
+
+def test_comments_grouped_no_post_ids():
+    """Test that an empty post ID list returns no groups without querying."""
+    print("\n" + "="*80)
+    print("TEST 2: No Post IDs")
+    print("="*80)
+
+    reader = DatabaseReader({})
+    reader.cursor = FakeCursor([])
+
+    assert reader.get_comments_grouped_by_post([]) == {}, "Empty input should give an empty mapping"
+    assert reader.cursor.executed == [], "No query should be executed"
+
+    print("\n✓ Empty input handled without a query!")
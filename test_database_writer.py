@@ -0,0 +1,361 @@
+"""
+Unit tests for DatabaseWriter COPY serialization and batch insert paths.
+Tests the COPY text-format helpers, and the pooled shard inserts with fake
+pool, connection and cursor objects, without requiring a database connection.
+"""
+
+from concurrent.futures import Future
+from datetime import date, datetime
+
+import psycopg2
+import pytest
+from psycopg2.errors import UndefinedTable
+
+from src import database_writer
+from src.database_writer import CHUNK_COLUMNS, DatabaseWriter, _build_copy_buffer, _format_copy_value
+
+
+def _rejected(post_id):
+    """Rows whose post_id starts with BAD violate a constraint on every insert path."""
+    return post_id.startswith('BAD')
+
+
+class FakeCursor:
+    """Cursor that parses COPY buffers into the connection's inserted post IDs."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+
+    def copy_expert(self, sql, buffer):
+        if self.connection.copy_error is not None:
+            raise self.connection.copy_error
+        post_ids = [line.split('\t')[0] for line in buffer.read().splitlines()]
+        if any(map(_rejected, post_ids)):
+            raise psycopg2.DataError("constraint violated")
+        self.connection.copied.extend(post_ids)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class FakeConnection:
+    """Connection counting commits and rollbacks; ``copy_error`` is raised by every COPY."""
+
+    def __init__(self, copy_error=None):
+        self.copy_error = copy_error
+        self.copied = []
+        self.inserted = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakePool:
+    """Pool handing out the given connections in order and recording putconn calls."""
+
+    def __init__(self, connections):
+        self.available = list(connections)
+        self.returned = []
+        self.closed = False
+
+    def getconn(self):
+        return self.available.pop(0)
+
+    def putconn(self, connection, close=False):
+        self.returned.append((connection, close))
+
+
+class ImmediateExecutor:
+    """Executor running each task on submit, so shards take connections in order."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@pytest.fixture
+def inserted_pages(monkeypatch):
+    """Replace execute_values with a fake that records each page of rows it inserts."""
+    pages = []
+
+    def fake_execute_values(cursor, sql, rows, template=None, page_size=100):
+        post_ids = [row[0] for row in rows]
+        if any(map(_rejected, post_ids)):
+            raise psycopg2.DataError("constraint violated")
+        pages.append(post_ids)
+        cursor.connection.inserted.extend(post_ids)
+        cursor.rowcount = len(rows)
+
+    monkeypatch.setattr(database_writer, "execute_values", fake_execute_values)
+    return pages
+
+
+def _chunks(*post_ids):
+    return [
+        {'post_id': post_id, 'timestamp': None, 'full_chunk': f"Chunk {post_id}", 'engagement_score': 0}
+        for post_id in post_ids
+    ]
+
+
+def _pooled_writer(connections, pool_size=2):
+    writer = DatabaseWriter({}, pool_size=pool_size)
+    writer.pool = FakePool(connections)
+    writer.executor = ImmediateExecutor()
+    return writer
+
+
+def test_copy_value_escapes():
+    """Test that COPY special characters are backslash-escaped."""
+    print("\n" + "="*80)
+    print("TEST 1: COPY Value Escapes")
+    print("="*80)
+
+    assert _format_copy_value("a\\b") == "a\\\\b", "Backslash should be doubled"
+    assert _format_copy_value("a\tb") == "a\\tb", "Tab should be escaped"
+    assert _format_copy_value("a\nb") == "a\\nb", "Newline should be escaped"
+    assert _format_copy_value("a\rb") == "a\\rb", "Carriage return should be escaped"
+    assert _format_copy_value("\\N") == "\\\\N", "Literal \\N text must not read back as NULL"
+    assert _format_copy_value("plain text") == "plain text", "Plain text should be unchanged"
+
+    print("\n✓ COPY special characters escaped correctly!")
+
+
+def test_copy_value_null_and_types():
+    """Test NULL, integer and date/datetime formatting."""
+    print("\n" + "="*80)
+    print("TEST 2: COPY NULL and Typed Values")
+    print("="*80)
+
+    assert _format_copy_value(None) == "\\N", "None should be written as \\N"
+    assert _format_copy_value(0) == "0", "Zero should not be treated as NULL"
+    assert _format_copy_value("") == "", "Empty string should not be treated as NULL"
+    assert _format_copy_value(datetime(2026, 1, 13, 10, 30, 5)) == "2026-01-13T10:30:05", "Datetime should use ISO format"
+    assert _format_copy_value(date(2026, 1, 13)) == "2026-01-13", "Date should use ISO format"
+
+    print("\n✓ NULL and typed values formatted correctly!")
+
+
+def test_build_copy_buffer():
+    """Test that chunks are serialized one tab-separated line per row."""
+    print("\n" + "="*80)
+    print("TEST 3: COPY Buffer")
+    print("="*80)
+
+    chunks = [
+        {
+            'post_id': 'POST_001',
+            'timestamp': datetime(2026, 1, 13, 10, 30, 0),
+            'full_chunk': "Title: A\n\n---\n\nQuestion:\tB\\C",
+            'engagement_score': 3
+        },
+        {
+            'post_id': 'POST_002',
+            'timestamp': None,
+            'full_chunk': 'No timestamp',
+            'engagement_score': 0
+        }
+    ]
+
+    buffer = _build_copy_buffer(map(CHUNK_COLUMNS, chunks))
+    lines = buffer.read().split('\n')
+
+    assert lines == [
+        "POST_001\t2026-01-13T10:30:00\tTitle: A\\n\\n---\\n\\nQuestion:\\tB\\\\C\t3",
+        "POST_002\t\\N\tNo timestamp\t0",
+        ""
+    ], f"Unexpected COPY buffer lines: {lines}"
+
+    print("\n✓ COPY buffer built correctly!")
+    print(f"  Rows: {len(lines) - 1}")
+
+
+def test_shard_retried_on_new_connection():
+    """Test that a broken pooled connection is closed and the shard retried once."""
+    print("\n" + "="*80)
+    print("TEST 4: Shard Retry on Broken Connection")
+    print("="*80)
+
+    broken = FakeConnection(copy_error=psycopg2.OperationalError("server closed the connection"))
+    fresh = FakeConnection()
+    writer = _pooled_writer([broken, fresh])
+
+    rows = list(map(CHUNK_COLUMNS, _chunks('POST_001', 'POST_002')))
+    assert writer._insert_shard(rows) == 2, "Retried shard should insert every row"
+
+    assert writer.pool.returned == [(broken, True), (fresh, False)], "Broken connection should be closed, fresh one kept"
+    assert fresh.copied == ['POST_001', 'POST_002'], "Shard should be COPYed on the fresh connection"
+    assert fresh.commits == 1, "Shard should commit once on the fresh connection"
+
+    # A second connection failure is not retried again
+    writer = _pooled_writer([
+        FakeConnection(copy_error=psycopg2.OperationalError("down")),
+        FakeConnection(copy_error=psycopg2.OperationalError("still down"))
+    ])
+    with pytest.raises(psycopg2.OperationalError, match="still down"):
+        writer._insert_shard(rows)
+    assert [close for _, close in writer.pool.returned] == [True, True], "Both broken connections should be closed"
+
+    print("\n✓ Broken connection discarded and shard retried once!")
+
+
+def test_shard_copy_failure_falls_back_to_insert(inserted_pages):
+    """Test that a failed shard COPY is rolled back and retried with execute_values."""
+    print("\n" + "="*80)
+    print("TEST 5: Shard COPY Fallback")
+    print("="*80)
+
+    connection = FakeConnection(copy_error=psycopg2.DataError("malformed COPY data"))
+    writer = _pooled_writer([connection])
+
+    rows = list(map(CHUNK_COLUMNS, _chunks('POST_001', 'POST_002')))
+    assert writer._insert_shard(rows) == 2, "Fallback should insert every row"
+
+    assert connection.rollbacks == 1, "Failed COPY should be rolled back before the INSERT"
+    assert inserted_pages == [['POST_001', 'POST_002']], "Rows should be inserted in one execute_values page"
+    assert connection.commits == 1, "Shard should commit once"
+    assert writer.pool.returned == [(connection, False)], "Healthy connection should go back to the pool"
+
+    print("\n✓ COPY failure fell back to INSERT!")
+
+
+def test_shard_undefined_table_propagates(inserted_pages):
+    """Test that a missing table is raised without retrying the shard."""
+    print("\n" + "="*80)
+    print("TEST 6: Missing Table in Shard")
+    print("="*80)
+
+    connection = FakeConnection(copy_error=UndefinedTable('relation "facebook_chunks" does not exist'))
+    spare = FakeConnection()
+    writer = _pooled_writer([connection, spare])
+
+    with pytest.raises(UndefinedTable):
+        writer.insert_chunks_parallel(_chunks('POST_001'))
+
+    assert inserted_pages == [], "A missing table should not fall back to INSERT"
+    assert writer.pool.available == [spare], "A missing table should not be retried on another connection"
+    assert connection.rollbacks == 1, "Failed shard should be rolled back"
+    assert writer.pool.returned == [(connection, False)], "Connection should go back to the pool"
+
+    print("\n✓ Missing table raised without retry!")
+
+
+def test_parallel_counts_failed_shards(inserted_pages):
+    """Test that a failed shard is counted as failed while the other shards succeed."""
+    print("\n" + "="*80)
+    print("TEST 7: Parallel Insert With a Failed Shard")
+    print("="*80)
+
+    first = FakeConnection()
+    second = FakeConnection()
+    writer = _pooled_writer([first, second])
+
+    stats = writer.insert_chunks_parallel(_chunks('POST_001', 'POST_002', 'BAD_003', 'POST_004'))
+
+    assert stats == {'total': 4, 'success': 2, 'failed': 2}, f"Unexpected stats: {stats}"
+    assert first.copied == ['POST_001', 'POST_002'], "First shard should be COPYed"
+    assert first.commits == 1, "First shard should commit"
+    assert second.copied == [] and second.inserted == [], "Failed shard should insert nothing"
+    assert second.commits == 0 and second.rollbacks == 2, "Failed shard should roll back COPY and INSERT"
+    assert writer.get_statistics() == {'total_inserted': 2, 'total_failed': 2}, "Writer totals mismatch"
+
+    print("\n✓ Failed shard isolated from the others!")
+    print(f"  Stats: {stats}")
+
+
+def _single_writer(connection):
+    writer = DatabaseWriter({})
+    writer.connection = connection
+    writer.cursor = connection.cursor()
+    return writer
+
+
+def test_transaction_defers_commit():
+    """Test that batches inside transaction() are committed once, when the block exits."""
+    print("\n" + "="*80)
+    print("TEST 8: Transaction Defers Commits")
+    print("="*80)
+
+    connection = FakeConnection()
+    writer = _single_writer(connection)
+
+    with writer.transaction():
+        writer.insert_chunks_batch(_chunks('POST_001', 'POST_002'))
+        writer.insert_chunks_batch(_chunks('POST_003'))
+        assert connection.commits == 0, "Commits should wait until the block exits"
+        assert writer.insert_count == 3, "Pending inserts should be counted"
+
+    assert connection.commits == 1, "Block exit should commit once"
+    assert connection.copied == ['POST_001', 'POST_002', 'POST_003'], "Every batch should be COPYed"
+    assert writer.insert_count == 0, "Insert count should be reset by the commit"
+    assert writer.total_inserted == 3, f"Expected 3 inserted, got {writer.total_inserted}"
+
+    print("\n✓ Transaction committed once on exit!")
+
+
+def test_transaction_copy_failure_rolls_back(inserted_pages):
+    """Test that a COPY failure inside transaction() raises and rolls back without INSERT fallback."""
+    print("\n" + "="*80)
+    print("TEST 9: Transaction Rollback on COPY Failure")
+    print("="*80)
+
+    connection = FakeConnection()
+    writer = _single_writer(connection)
+
+    with pytest.raises(psycopg2.DataError):
+        with writer.transaction():
+            writer.insert_chunks_batch(_chunks('POST_001', 'POST_002'))
+            writer.insert_chunks_batch(_chunks('POST_003', 'BAD_004'))
+
+    assert inserted_pages == [], "INSERT fallback should not run inside a transaction"
+    assert connection.commits == 0, "Nothing should be committed"
+    assert connection.rollbacks == 1, "The whole transaction should be rolled back once"
+    assert writer.insert_count == 0, "Insert count should be reset after the rollback"
+    assert writer._in_transaction is False, "Transaction flag should be cleared"
+
+    print("\n✓ Transaction rolled back without INSERT fallback!")
+
+
+def test_batch_fallback_outside_transaction(inserted_pages):
+    """Test that outside transaction() a failed COPY falls back to INSERT and returns batch stats."""
+    print("\n" + "="*80)
+    print("TEST 10: Batch Fallback Outside Transaction")
+    print("="*80)
+
+    connection = FakeConnection(copy_error=psycopg2.DataError("malformed COPY data"))
+    writer = _single_writer(connection)
+
+    stats = writer.insert_chunks_batch(_chunks('POST_001', 'POST_002'))
+
+    assert stats == {'total': 2, 'success': 2, 'failed': 0}, f"Unexpected stats: {stats}"
+    assert inserted_pages == [['POST_001', 'POST_002']], "Batch should be inserted by execute_values"
+    assert connection.commits == 1, "Batch should commit on its own"
+
+    stats = writer.insert_chunks_batch(_chunks('POST_003', 'BAD_004'))
+
+    assert stats == {'total': 2, 'success': 0, 'failed': 2}, f"Unexpected stats: {stats}"
+    assert connection.commits == 1, "Failed batch should not commit"
+    assert connection.rollbacks == 3, "Each failed COPY or INSERT should roll back"
+    assert writer.insert_count == 0, "Insert count should be reset after the rollback"
+    assert writer.get_statistics() == {'total_inserted': 2, 'total_failed': 2}, "Writer totals mismatch"
+
+    print("\n✓ COPY fell back to INSERT with per-batch stats!")
+    print(f"  Stats: {stats}")
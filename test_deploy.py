@@ -0,0 +1,59 @@
+"""
+Unit tests for the deployment zip builder.
+Tests that create_zip writes valid stored and deflated members on a temporary tree.
+"""
+
+import os
+import zipfile
+import zlib
+
+import deploy
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_create_zip_members(tmp_path):
+    """Test that members are stored or deflated by type, with correct CRCs and contents."""
+    print("\n" + "="*80)
+    print("TEST 1: Deployment Zip Members")
+    print("="*80)
+
+    source = tmp_path / "layer"
+    files = {
+        "python/pkg/__init__.py": b"",
+        "python/pkg/module.py": b"def handler():\n    return 'ok'\n" * 200,
+        "python/pkg/_ext.so": bytes(range(256)) * 64,
+        "lambda_function.py": b"print('handler')\n",
+    }
+    for name, data in files.items():
+        _write(source / name, data)
+
+    # Excluded entries must not reach the zip
+    _write(source / "python/pkg/__pycache__/module.cpython-312.pyc", b"bytecode")
+    _write(source / "python/pkg-1.0.dist-info/METADATA", b"Name: pkg")
+    _write(source / "python/pkg/module.pyi", b"def handler() -> str: ...")
+
+    zip_path = tmp_path / "layer.zip"
+    deploy.create_zip([(str(source), ""), (str(tmp_path / "missing"), "missing")], str(zip_path))
+
+    with zipfile.ZipFile(zip_path) as zipf:
+        assert zipf.testzip() is None, "Every member should pass its CRC check"
+        assert sorted(zipf.namelist()) == sorted(files), f"Unexpected members: {zipf.namelist()}"
+
+        for name, data in files.items():
+            info = zipf.getinfo(name)
+            expected_type = zipfile.ZIP_STORED if name.endswith(".so") else zipfile.ZIP_DEFLATED
+            assert info.compress_type == expected_type, f"{name} has compress_type {info.compress_type}"
+            assert info.CRC == zlib.crc32(data), f"{name} has a wrong CRC"
+            assert info.file_size == len(data), f"{name} has a wrong size"
+            assert zipf.read(name) == data, f"{name} content mismatch"
+
+        module_info = zipf.getinfo("python/pkg/module.py")
+        assert module_info.compress_size < module_info.file_size, "Source files should be compressed"
+
+    print("\n✓ Zip members written correctly!")
+    print(f"  Members: {len(files)}")
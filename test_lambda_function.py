@@ -0,0 +1,179 @@
+"""
+Unit tests for the Lambda handler's producer/consumer pipeline.
+Tests batching, aggregation and error propagation with fake reader and writer objects.
+"""
+
+import threading
+
+import pytest
+
+import lambda_function
+from src.chunk_generator import ChunkGenerator
+
+
+class FakeReader:
+    """Reader yielding ``post_count`` posts; odd post IDs have one comment."""
+
+    def __init__(self, post_count, fail_after=None):
+        self.post_count = post_count
+        self.fail_after = fail_after
+
+    def iter_posts(self):
+        for post_id in range(self.post_count):
+            if post_id == self.fail_after:
+                raise ValueError("read failed")
+            yield {
+                'post_id': post_id,
+                'timestamp': None,
+                'author': 'Author',
+                'title': 'Title',
+                'post_texts': 'Post text'
+            }
+
+    def get_comments_grouped_by_post(self, post_ids):
+        return {
+            post_id: [{'post_id': post_id, 'comment_texts': 'Comment'}]
+            for post_id in post_ids if post_id % 2
+        }
+
+
+class FakeWriter:
+    """Writer recording batch sizes; reports one failed chunk per batch if asked."""
+
+    def __init__(self, fail_one_per_batch=False, raise_on_batch=None):
+        self.batch_sizes = []
+        self.fail_one_per_batch = fail_one_per_batch
+        self.raise_on_batch = raise_on_batch
+
+    def insert_chunks_batch(self, chunks):
+        if len(self.batch_sizes) == self.raise_on_batch:
+            raise RuntimeError("insert failed")
+        self.batch_sizes.append(len(chunks))
+        failed = 1 if self.fail_one_per_batch else 0
+        return {'total': len(chunks), 'success': len(chunks) - failed, 'failed': failed}
+
+
+@pytest.fixture(scope="module")
+def chunk_gen():
+    """ChunkGenerator shared by the module."""
+    return ChunkGenerator(chunk_size=50)
+
+
+def _producer_alive():
+    return any(thread.name == "chunk-producer" for thread in threading.enumerate())
+
+
+def test_pipeline_aggregates_batches(chunk_gen):
+    """Test that every post is inserted once and batch stats are summed."""
+    print("\n" + "="*80)
+    print("TEST 1: Pipeline Aggregation")
+    print("="*80)
+
+    writer = FakeWriter(fail_one_per_batch=True)
+    posts_processed, insert_stats = lambda_function._run_pipeline(
+        FakeReader(25), writer, chunk_gen, 10
+    )
+
+    assert posts_processed == 25, f"Expected 25 posts, got {posts_processed}"
+    assert writer.batch_sizes == [10, 10, 5], f"Unexpected batch sizes: {writer.batch_sizes}"
+    assert insert_stats == {'total': 25, 'success': 22, 'failed': 3}, f"Unexpected stats: {insert_stats}"
+    assert not _producer_alive(), "Producer thread should have finished"
+
+    print("\n✓ Pipeline aggregated all batches!")
+    print(f"  Batch sizes: {writer.batch_sizes}")
+    print(f"  Stats: {insert_stats}")
+
+
+def test_pipeline_no_posts(chunk_gen):
+    """Test that an empty posts table produces no inserts."""
+    print("\n" + "="*80)
+    print("TEST 2: Pipeline With No Posts")
+    print("="*80)
+
+    writer = FakeWriter()
+    posts_processed, insert_stats = lambda_function._run_pipeline(
+        FakeReader(0), writer, chunk_gen, 10
+    )
+
+    assert posts_processed == 0, "No posts should be processed"
+    assert writer.batch_sizes == [], "Writer should not be called"
+    assert insert_stats == {'total': 0, 'success': 0, 'failed': 0}, f"Unexpected stats: {insert_stats}"
+
+    print("\n✓ Empty input handled!")
+
+
+def test_pipeline_reraises_producer_error(chunk_gen, monkeypatch):
+    """Test that a reader failure in the producer thread is re-raised by the consumer."""
+    print("\n" + "="*80)
+    print("TEST 3: Producer Exception")
+    print("="*80)
+
+    # Small post batches, so chunks are produced before the reader fails
+    monkeypatch.setattr(lambda_function, "POST_BATCH_SIZE", 5)
+
+    writer = FakeWriter()
+    with pytest.raises(ValueError, match="read failed"):
+        lambda_function._run_pipeline(FakeReader(25, fail_after=15), writer, chunk_gen, 10)
+
+    assert writer.batch_sizes == [10], f"Only the batch read before the failure should be inserted, got {writer.batch_sizes}"
+    assert not _producer_alive(), "Producer thread should have finished"
+
+    print("\n✓ Producer exception re-raised!")
+
+
+def test_pipeline_stops_producer_on_consumer_error(chunk_gen):
+    """Test that an insert failure stops and drains the producer before propagating."""
+    print("\n" + "="*80)
+    print("TEST 4: Consumer Exception")
+    print("="*80)
+
+    # Many small batches, so the producer is blocked on the full queue when the insert fails
+    writer = FakeWriter(raise_on_batch=1)
+    with pytest.raises(RuntimeError, match="insert failed"):
+        lambda_function._run_pipeline(FakeReader(500), writer, chunk_gen, 5)
+
+    assert writer.batch_sizes == [5], f"Only the first batch should be inserted, got {writer.batch_sizes}"
+    assert not _producer_alive(), "Producer thread should have been stopped"
+
+    print("\n✓ Consumer exception propagated and producer stopped!")
+
+
+class FakeConnection:
+    """Reader/writer stand-in recording connect and disconnect calls."""
+
+    def __init__(self, *args, connected=True, **kwargs):
+        self.connected = connected
+        self.disconnected = False
+
+    def connect(self):
+        self.connected = True
+
+    def disconnect(self):
+        self.disconnected = True
+
+    def is_connected(self):
+        return self.connected
+
+
+def test_dead_cached_connections_disconnected(monkeypatch):
+    """Test that dead cached reader and writer are disconnected before being replaced."""
+    print("\n" + "="*80)
+    print("TEST 5: Dead Cached Connections Replaced")
+    print("="*80)
+
+    monkeypatch.setattr("src.database_reader.DatabaseReader", FakeConnection)
+    monkeypatch.setattr("src.database_writer.DatabaseWriter", FakeConnection)
+
+    dead_reader = FakeConnection(connected=False)
+    dead_writer = FakeConnection(connected=False)
+    monkeypatch.setattr(lambda_function, "_db_reader", dead_reader)
+    monkeypatch.setattr(lambda_function, "_db_writer", dead_writer)
+
+    db_reader, db_writer = lambda_function._get_db_connections({}, 10)
+
+    assert dead_reader.disconnected, "Dead reader should be disconnected"
+    assert dead_writer.disconnected, "Dead writer should be disconnected"
+    assert db_reader is not dead_reader and db_reader.connected, "Reader should be replaced and connected"
+    assert db_writer is not dead_writer and db_writer.connected, "Writer should be replaced and connected"
+
+    print("\n✓ Dead connections disconnected and replaced!")